@@ -4,6 +4,11 @@
 
 from a1_partc import Queue
 
+# The iterative engines give up on a grid that is still overflowing after
+# this many waves per cell; real positions settle in a couple per cell,
+# but some grids never settle
+WAVES_PER_CELL = 10
+
 def get_overflow_list(grid):
 	overflow_list = []
 	rol_len = len(grid)
@@ -30,10 +35,31 @@ def get_overflow_list(grid):
 
 
 
-def overflow(grid, a_queue):
+def overflow(grid, a_queue, engine=None, deltas=False):
+	# Run the overflow with the chosen engine, or the default one
+	# Every engine leaves the same grid, enqueues the same wave snapshots
+	# and returns the same number of waves
+	# With deltas=True each wave is enqueued as a list of (row, col, value)
+	# for the cells it changed, in row major order, instead of a full copy
+	if engine is None:
+		engine = default_engine
+	if engine not in OVERFLOW_ENGINES:
+		raise ValueError('unknown overflow engine: {}'.format(engine))
+	return OVERFLOW_ENGINES[engine](grid, a_queue, deltas)
+
+def set_overflow_engine(engine):
+	# Change the engine overflow() uses when none is given
+	global default_engine
+	if engine not in OVERFLOW_ENGINES:
+		raise ValueError('unknown overflow engine: {}'.format(engine))
+	default_engine = engine
+
+def overflow_recursive(grid, a_queue, deltas=False):
 	overflow_list = get_overflow_list(grid)
 	if overflow_list == None or check_all_same_sign(grid):
 		return 0
+	if deltas:
+		before = [row[:] for row in grid]
 
 	directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # right, left, down, up
 	rol_len = len(grid)
@@ -68,11 +94,226 @@ def overflow(grid, a_queue):
 		grid[x][y] = 0
 
 	# Add the grid to the queue by value NOT by reference
-	new_grid = [row[:] for row in grid]
-	a_queue.enqueue(new_grid)
+	if deltas:
+		a_queue.enqueue([(i, j, grid[i][j]) for i in range(rol_len) for j in range(col_len)
+			if grid[i][j] != before[i][j]])
+	else:
+		new_grid = [row[:] for row in grid]
+		a_queue.enqueue(new_grid)
 
 	# Recursion
-	return 1 + overflow(grid, a_queue)
+	return 1 + overflow_recursive(grid, a_queue, deltas)
+
+def overflow_frontier(grid, a_queue, deltas=False):
+	rol_len = len(grid)
+	col_len = len(grid[0])
+	directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # right, left, down, up
+
+	# Number of pieces at which each cell overflows, same as get_overflow_list
+	capacity = [[4 - (i == 0 or i == rol_len - 1) - (j == 0 or j == col_len - 1)
+			for j in range(col_len)] for i in range(rol_len)]
+
+	# counts[0] is the number of positive cells, counts[1] the negative ones
+	# They are kept up to date on every write so the same sign check is O(1)
+	counts = [0, 0]
+	for row in grid:
+		for cell in row:
+			if cell > 0:
+				counts[0] += 1
+			elif cell < 0:
+				counts[1] += 1
+
+	# Only cells written by the previous wave can overflow in the next one,
+	# so only the first wave looks at the whole grid
+	candidates = [(i, j) for i in range(rol_len) for j in range(col_len)]
+	steps = 0
+	while True:
+		overflow_list = [(i, j) for i, j in candidates if abs(grid[i][j]) >= capacity[i][j]]
+		if not overflow_list or counts[0] == 0 or counts[1] == 0:
+			return steps
+		check_wave_cap(steps, rol_len, col_len)
+		overflow_set = set(overflow_list)
+		touched = set()
+		# Value of every cell before its first write in this wave
+		before = {} if deltas else None
+
+		# Increase 1 to all the neighbors of the overflow cells
+		for x, y in overflow_list:
+			for dx, dy in directions:
+				nx, ny = x + dx, y + dy
+				if 0 <= nx < rol_len and 0 <= ny < col_len:
+					value = abs(grid[nx][ny]) + 1
+					if grid[x][y] < 0:
+						value = -value
+					set_cell(grid, nx, ny, value, counts, before)
+					touched.add((nx, ny))
+
+		# Pair up neighboring overflow cells in the same order as the
+		# pairwise scan: a cell only pairs with the later cell to its right
+		# and then with the later cell below it
+		neighbor_set = set()
+		for x, y in overflow_list:
+			for other in [(x, y + 1), (x + 1, y)]:
+				if other in overflow_set:
+					sign_t1 = is_positive(grid[x][y])
+					sign_t2 = is_positive(grid[other[0]][other[1]])
+					set_cell(grid, x, y, 1 if sign_t2 else -1, counts, before)
+					set_cell(grid, other[0], other[1], 1 if sign_t1 else -1, counts, before)
+					neighbor_set.add((x, y))
+					neighbor_set.add(other)
+
+		# The rest of the overflow cells will become 0
+		for x, y in overflow_list:
+			if (x, y) not in neighbor_set:
+				set_cell(grid, x, y, 0, counts, before)
+
+		# Add the grid to the queue by value NOT by reference
+		if deltas:
+			a_queue.enqueue([(i, j, grid[i][j]) for (i, j), old in sorted(before.items()) if grid[i][j] != old])
+		else:
+			a_queue.enqueue([row[:] for row in grid])
+		steps += 1
+		candidates = sorted(touched)
+
+def overflow_numpy(grid, a_queue, deltas=False):
+	# numpy is imported on first use, by the numpy engine only; it takes
+	# longer to import than the rest of the game
+	try:
+		import numpy as np
+	except ImportError:
+		raise ImportError('the numpy overflow engine needs numpy')
+	a = np.array(grid, dtype=np.int32)
+	capacity = numpy_capacity(len(grid), len(grid[0]))
+	steps = 0
+	while True:
+		over = np.abs(a) >= capacity
+		# Stop when nothing overflows or all the pieces have the same sign
+		if not over.any() or not (a > 0).any() or not (a < 0).any():
+			break
+		check_wave_cap(steps, len(grid), len(grid[0]))
+		new = numpy_wave(a, over)
+		if deltas:
+			rows, cols = np.nonzero(new != a)
+			a_queue.enqueue(list(zip(rows.tolist(), cols.tolist(), new[rows, cols].tolist())))
+		else:
+			a_queue.enqueue(new.tolist())
+		a = new
+		steps += 1
+
+	# Write the result back into the caller's lists
+	if steps:
+		for i, row in enumerate(a.tolist()):
+			grid[i][:] = row
+	return steps
+
+# Number of pieces at which each cell overflows, as an array
+def numpy_capacity(rows, cols):
+	import numpy as np
+	row_edge = np.zeros(rows, dtype=np.int32)
+	row_edge[0] = row_edge[-1] = 1
+	col_edge = np.zeros(cols, dtype=np.int32)
+	col_edge[0] = col_edge[-1] = 1
+	return 4 - row_edge[:, None] - col_edge[None, :]
+
+# shifted(x, dr, dc)[r, c] is x[r + dr, c + dc], or 0/False off the grid
+# Works on the last two axes, so a stack of grids is shifted at once
+def shifted(x, dr, dc):
+	import numpy as np
+	rows, cols = x.shape[-2:]
+	y = np.zeros_like(x)
+	y[..., max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)] = \
+		x[..., max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)]
+	return y
+
+# For every position, the index of the first cell of the run of cells
+# joined to their left neighbour that it belongs to
+def run_starts(joined_left):
+	import numpy as np
+	idx = np.arange(joined_left.shape[-1])
+	return np.maximum.accumulate(np.where(joined_left, 0, idx), axis=-1)
+
+# Compute one wave of overflow_recursive with whole array operations
+# a holds one grid (rows, cols) or a stack of them (..., rows, cols) and
+# over marks the cells that overflow in this wave
+def numpy_wave(a, over):
+	import numpy as np
+	rows, cols = a.shape[-2:]
+	negative = a < 0
+
+	# The cells pass their sign in row major order and an overflow cell
+	# passes the sign it has when its turn comes: that of its left neighbour
+	# if that one overflowed, else that of the cell above if it overflowed,
+	# else its own. Along a row a run of overflow cells passes the sign of
+	# the run's first cell, so only the rows need a loop.
+	passed = negative.copy()
+	for r in range(rows):
+		base = negative[..., r, :]
+		if r > 0:
+			base = np.where(over[..., r - 1, :], passed[..., r - 1, :], base)
+		joined = np.zeros_like(over[..., r, :])
+		joined[..., 1:] = over[..., r, 1:] & over[..., r, :-1]
+		passed[..., r, :] = np.take_along_axis(base, run_starts(joined), axis=-1)
+
+	# Every cell gains one piece per overflowing neighbour and ends up with
+	# the sign of the last of them to pass: down, then right, left, up
+	down, right = shifted(over, 1, 0), shifted(over, 0, 1)
+	left, up = shifted(over, 0, -1), shifted(over, -1, 0)
+	gained = down.astype(np.int32) + right + left + up
+	last_negative = np.where(down, shifted(passed, 1, 0),
+		np.where(right, shifted(passed, 0, 1),
+		np.where(left, shifted(passed, 0, -1), shifted(passed, -1, 0))))
+	size = np.abs(a) + gained
+	after = np.where(gained > 0, np.where(last_negative, -size, size), a)
+
+	# Neighbouring overflow cells swap signs pair by pair: each cell first
+	# with the cell to its right, then with the cell below. Along a row the
+	# sign of a run's first cell is carried to its end and each other cell
+	# takes the sign of its right neighbour before swapping with the cell
+	# below, so again only the rows need a loop.
+	h_pair = over & right
+	v_pair = over & down
+	in_pair = h_pair | shifted(h_pair, 0, -1) | v_pair | shifted(v_pair, -1, 0)
+	sign = after >= 0
+	final = sign.copy()
+	for r in range(rows):
+		row_sign = sign[..., r, :]
+		joined = np.zeros_like(h_pair[..., r, :])
+		joined[..., 1:] = h_pair[..., r, :-1]
+		next_sign = np.zeros_like(row_sign)
+		next_sign[..., :-1] = row_sign[..., 1:]
+		held = np.where(h_pair[..., r, :], next_sign, np.take_along_axis(row_sign, run_starts(joined), axis=-1))
+		if r + 1 < rows:
+			below = sign[..., r + 1, :].copy()
+			final[..., r, :] = np.where(v_pair[..., r, :], below, held)
+			sign[..., r + 1, :] = np.where(v_pair[..., r, :], held, below)
+		else:
+			final[..., r, :] = held
+
+	# Paired overflow cells keep one piece, the others are emptied
+	paired = np.where(final, 1, -1)
+	return np.where(over, np.where(in_pair, paired, 0), after).astype(a.dtype)
+
+# Raise if a grid is still overflowing after WAVES_PER_CELL waves per cell,
+# as overflow_recursive does when it runs out of stack
+def check_wave_cap(steps, rows, cols):
+	if steps >= WAVES_PER_CELL * rows * cols:
+		raise RuntimeError('the overflow has not settled after {} waves'.format(steps))
+
+# Write a cell and keep the positive/negative cell counts in step
+# If before is given, the cell's value is noted in it on its first write
+def set_cell(grid, row, col, value, counts, before=None):
+	old = grid[row][col]
+	if before is not None and (row, col) not in before:
+		before[(row, col)] = old
+	if old > 0:
+		counts[0] -= 1
+	elif old < 0:
+		counts[1] -= 1
+	if value > 0:
+		counts[0] += 1
+	elif value < 0:
+		counts[1] += 1
+	grid[row][col] = value
 
 def is_neighbor(cell1, cell2):
 	x1, y1 = cell1
@@ -115,3 +356,12 @@ def set_two_neighbor_overflow_cell(c1, c2, grid):
 	# Set the t1 and t2 to 1 or -1
 	grid[c1[0]][c1[1]] = 1 if sign_t2 else -1
 	grid[c2[0]][c2[1]] = 1 if sign_t1 else -1
+
+
+# Engines overflow() can use, by name
+OVERFLOW_ENGINES = {
+	'recursive': overflow_recursive,
+	'frontier': overflow_frontier,
+	'numpy': overflow_numpy,
+}
+default_engine = 'recursive'
@@ -162,3 +162,450 @@ class HashTable:
         int: The number of records currently stored in the table.
         """
         return self.size
+
+
+class RobinHoodHashTable:
+    # Same interface as HashTable, built for speed: keys, values and their
+    # hashes live in three parallel lists instead of a tuple per slot, and
+    # collisions are resolved with robin-hood probing, where an entry that
+    # is further from its home slot takes the place of one that is closer.
+    # That keeps probe sequences short and lets a search stop as soon as
+    # it meets an entry closer to home than the key would be.
+    __slots__ = ("keys", "values", "hashes", "capacity_value", "size", "max_load")
+
+    def __init__(self, cap=32, max_load=0.7):
+        """
+        Initialize the hash table with a given capacity.
+
+        Parameters:
+        cap (int): The initial capacity of the hash table. Defaults to 32.
+        max_load (float): The table doubles when more than this fraction
+                          of its slots is in use. Defaults to 0.7.
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        self.capacity_value = cap
+        self.max_load = max_load
+        self.keys = [None] * cap
+        self.values = [None] * cap
+        self.hashes = [None] * cap  # hash of the key in each slot, None when empty
+        self.size = 0
+
+    def find(self, key, key_hash):
+        """
+        Find the slot holding a key.
+
+        Returns:
+        int: The index of the slot, -1 if the key is not in the table.
+        """
+        cap = self.capacity_value
+        hashes = self.hashes
+        idx = key_hash % cap
+        dist = 0
+        while True:
+            slot_hash = hashes[idx]
+            if slot_hash is None:
+                return -1
+            if slot_hash == key_hash and self.keys[idx] == key:
+                return idx
+            # The key would have displaced an entry this close to its home
+            if (idx - slot_hash) % cap < dist:
+                return -1
+            idx = (idx + 1) % cap
+            dist += 1
+
+    def place(self, key, value, key_hash, idx, dist):
+        """
+        Put an entry that is not in the table yet into it, starting the
+        probe at slot idx, dist slots from the entry's home.
+        """
+        cap = self.capacity_value
+        keys = self.keys
+        values = self.values
+        hashes = self.hashes
+        while hashes[idx] is not None:
+            slot_dist = (idx - hashes[idx]) % cap
+            if slot_dist < dist:
+                # Rob the richer entry of its slot and carry it on instead
+                keys[idx], key = key, keys[idx]
+                values[idx], value = value, values[idx]
+                hashes[idx], key_hash = key_hash, hashes[idx]
+                dist = slot_dist
+            idx = (idx + 1) % cap
+            dist += 1
+        keys[idx] = key
+        values[idx] = value
+        hashes[idx] = key_hash
+
+    def resize(self, cap):
+        """
+        Move every entry into a table of a new capacity, reusing the cached
+        hashes instead of hashing the keys again.
+        """
+        old = zip(self.keys, self.values, self.hashes)
+        self.capacity_value = cap
+        self.keys = [None] * cap
+        self.values = [None] * cap
+        self.hashes = [None] * cap
+        for key, value, key_hash in old:
+            if key_hash is not None:
+                self.place(key, value, key_hash, key_hash % cap, 0)
+
+    def insert(self, key, value):
+        """
+        Insert a key-value pair into the hash table.
+
+        Returns:
+        bool: True if the pair was added, False if the key already exists.
+        """
+        key_hash = hash(key)
+        cap = self.capacity_value
+        hashes = self.hashes
+        idx = key_hash % cap
+        if hashes[idx] is None:
+            # Home slot free, the common case at this load
+            self.keys[idx] = key
+            self.values[idx] = value
+            hashes[idx] = key_hash
+            self.size += 1
+            if self.size > cap * self.max_load:
+                self.resize(cap * 2)
+            return True
+        dist = 0
+        # Look for the key along its probe sequence; where the search for it
+        # stops is also where it belongs
+        while True:
+            slot_hash = hashes[idx]
+            if slot_hash is None:
+                break
+            if slot_hash == key_hash and self.keys[idx] == key:
+                return False
+            if (idx - slot_hash) % cap < dist:
+                break
+            idx = (idx + 1) % cap
+            dist += 1
+        self.place(key, value, key_hash, idx, dist)
+        self.size += 1
+        if self.size > cap * self.max_load:
+            self.resize(cap * 2)
+        return True
+
+    def modify(self, key, value):
+        """
+        Modify the value associated with a key.
+
+        Returns:
+        bool: True if the value was modified, False if the key does not exist.
+        """
+        idx = self.find(key, hash(key))
+        if idx < 0:
+            return False
+        self.values[idx] = value
+        return True
+
+    def remove(self, key):
+        """
+        Remove a key-value pair from the hash table.
+
+        The entries after it that are away from their home slot are shifted
+        back by one, so no tombstones are left and probe sequences stay as
+        short as if the key had never been inserted.
+
+        Returns:
+        bool: True if the pair was removed, False if the key does not exist.
+        """
+        idx = self.find(key, hash(key))
+        if idx < 0:
+            return False
+        cap = self.capacity_value
+        keys = self.keys
+        values = self.values
+        hashes = self.hashes
+        nxt = (idx + 1) % cap
+        while hashes[nxt] is not None and (nxt - hashes[nxt]) % cap != 0:
+            keys[idx] = keys[nxt]
+            values[idx] = values[nxt]
+            hashes[idx] = hashes[nxt]
+            idx = nxt
+            nxt = (nxt + 1) % cap
+        keys[idx] = None
+        values[idx] = None
+        hashes[idx] = None
+        self.size -= 1
+        return True
+
+    def search(self, key):
+        """
+        Search for the value associated with a key.
+
+        Returns:
+        The value associated with the key if found, otherwise None.
+        """
+        key_hash = hash(key)
+        cap = self.capacity_value
+        hashes = self.hashes
+        idx = key_hash % cap
+        slot_hash = hashes[idx]
+        if slot_hash == key_hash and self.keys[idx] == key:
+            # Found in its home slot, the common case
+            return self.values[idx]
+        dist = 0
+        keys = self.keys
+        while slot_hash is not None:
+            if slot_hash == key_hash and keys[idx] == key:
+                return self.values[idx]
+            if (idx - slot_hash) % cap < dist:
+                return None
+            idx += 1
+            if idx == cap:
+                idx = 0
+            dist += 1
+            slot_hash = hashes[idx]
+        return None
+
+    def capacity(self):
+        """
+        Get the current capacity of the hash table.
+
+        Returns:
+        int: The number of spots available in the hash table.
+        """
+        return self.capacity_value
+
+    def __len__(self):
+        """
+        Get the current number of elements in the hash table.
+
+        Returns:
+        int: The number of records currently stored in the table.
+        """
+        return self.size
+
+
+# Replacement policies of BoundedHashTable and the slots per bucket each uses
+REPLACEMENT_POLICIES = {"always": 1, "depth": 1, "two_tier": 2, "lru": 4}
+
+
+def first_item(value):
+    # Depth of a transposition table entry (depth, score, bound, move)
+    return value[0]
+
+
+class BoundedHashTable:
+    # Same interface as HashTable, but with a fixed number of slots: it
+    # never grows, and inserting into a full bucket replaces an entry
+    # according to the replacement policy, which suits caches such as a
+    # transposition table that must not grow over thousands of games.
+    #   always:   one slot per bucket, the new entry always wins
+    #   depth:    one slot per bucket, the entry searched deeper wins
+    #   two_tier: two slots per bucket, one kept by depth and one always
+    #             replaced, so deep results survive and fresh ones fit in
+    #   lru:      four slots per bucket, the least recently used goes
+    __slots__ = ("keys", "values", "hashes", "policy", "width", "buckets",
+                 "depth", "size", "evictions", "rejected")
+
+    def __init__(self, cap=1 << 16, policy="two_tier", depth=first_item):
+        """
+        Initialize the hash table with a fixed capacity.
+
+        Parameters:
+        cap (int): The number of slots, rounded down to whole buckets.
+        policy (str): One of REPLACEMENT_POLICIES.
+        depth (function): Gets the search depth from a value, for the
+                          depth and two_tier policies.
+        """
+        if policy not in REPLACEMENT_POLICIES:
+            raise ValueError("unknown replacement policy: {}".format(policy))
+        self.policy = policy
+        self.width = REPLACEMENT_POLICIES[policy]
+        self.buckets = max(1, cap // self.width)
+        self.depth = depth
+        slots = self.buckets * self.width
+        self.keys = [None] * slots
+        self.values = [None] * slots
+        self.hashes = [None] * slots  # hash of the key in each slot, None when empty
+        self.size = 0
+        self.evictions = 0  # entries thrown out to make room
+        self.rejected = 0   # inserts the policy turned down
+
+    def find(self, key, key_hash):
+        """
+        Find the slot holding a key.
+
+        Returns:
+        int: The index of the slot, -1 if the key is not in the table.
+        """
+        base = key_hash % self.buckets * self.width
+        for idx in range(base, base + self.width):
+            if self.hashes[idx] == key_hash and self.keys[idx] == key:
+                return idx
+        return -1
+
+    def write(self, idx, key, value, key_hash):
+        # Fill a slot, counting the entry it held as evicted
+        if self.hashes[idx] is None:
+            self.size += 1
+        else:
+            self.evictions += 1
+        self.keys[idx] = key
+        self.values[idx] = value
+        self.hashes[idx] = key_hash
+
+    def move(self, src, dst):
+        # Move the entry in slot src to slot dst, which is overwritten
+        self.keys[dst] = self.keys[src]
+        self.values[dst] = self.values[src]
+        self.hashes[dst] = self.hashes[src]
+
+    def clear(self, idx):
+        self.keys[idx] = None
+        self.values[idx] = None
+        self.hashes[idx] = None
+
+    def to_front(self, idx):
+        """
+        Make the entry in slot idx the most recently used of its bucket.
+
+        Returns:
+        int: The slot the entry is in now.
+        """
+        base = idx - idx % self.width
+        if idx != base:
+            key, value, key_hash = self.keys[idx], self.values[idx], self.hashes[idx]
+            for i in range(idx, base, -1):
+                self.move(i - 1, i)
+            self.keys[base] = key
+            self.values[base] = value
+            self.hashes[base] = key_hash
+        return base
+
+    def insert(self, key, value):
+        """
+        Insert a key-value pair into the hash table, replacing an entry by
+        the replacement policy if the bucket is full.
+
+        Returns:
+        bool: True if the pair was added. False if the key already exists
+              or the policy kept the entry already in the slot.
+        """
+        key_hash = hash(key)
+        if self.find(key, key_hash) >= 0:
+            return False
+        base = key_hash % self.buckets * self.width
+        if self.policy == "always":
+            self.write(base, key, value, key_hash)
+        elif self.policy == "depth":
+            if self.hashes[base] is not None and self.depth(value) < self.depth(self.values[base]):
+                self.rejected += 1
+                return False
+            self.write(base, key, value, key_hash)
+        elif self.policy == "two_tier":
+            # base keeps the deepest entry, base + 1 takes the rest
+            if self.hashes[base] is not None and self.depth(value) >= self.depth(self.values[base]):
+                if self.hashes[base + 1] is None:
+                    self.size += 1
+                else:
+                    self.evictions += 1
+                self.move(base, base + 1)
+                self.keys[base] = key
+                self.values[base] = value
+                self.hashes[base] = key_hash
+            elif self.hashes[base] is None:
+                self.write(base, key, value, key_hash)
+            else:
+                self.write(base + 1, key, value, key_hash)
+        else:
+            # The bucket is ordered most recently used first, the last
+            # slot is dropped when it is full
+            last = base + self.width - 1
+            if self.hashes[last] is not None:
+                self.evictions += 1
+                self.size -= 1
+            for i in range(last, base, -1):
+                self.move(i - 1, i)
+            self.clear(base)
+            self.write(base, key, value, key_hash)
+        return True
+
+    def modify(self, key, value):
+        """
+        Modify the value associated with a key.
+
+        Returns:
+        bool: True if the value was modified, False if the key does not exist.
+        """
+        idx = self.find(key, hash(key))
+        if idx < 0:
+            return False
+        if self.policy == "lru":
+            idx = self.to_front(idx)
+        self.values[idx] = value
+        return True
+
+    def remove(self, key):
+        """
+        Remove a key-value pair from the hash table.
+
+        Returns:
+        bool: True if the pair was removed, False if the key does not exist.
+        """
+        idx = self.find(key, hash(key))
+        if idx < 0:
+            return False
+        if self.policy == "lru":
+            # Keep the used slots of the bucket together at its front
+            last = idx - idx % self.width + self.width - 1
+            for i in range(idx, last):
+                self.move(i + 1, i)
+            idx = last
+        self.clear(idx)
+        self.size -= 1
+        return True
+
+    def search(self, key):
+        """
+        Search for the value associated with a key.
+
+        Returns:
+        The value associated with the key if found, otherwise None.
+        """
+        idx = self.find(key, hash(key))
+        if idx < 0:
+            return None
+        if self.policy == "lru":
+            idx = self.to_front(idx)
+        return self.values[idx]
+
+    def capacity(self):
+        """
+        Get the capacity of the hash table, which never changes.
+
+        Returns:
+        int: The number of slots in the hash table.
+        """
+        return self.buckets * self.width
+
+    def __len__(self):
+        """
+        Get the current number of elements in the hash table.
+
+        Returns:
+        int: The number of records currently stored in the table.
+        """
+        return self.size
+
+    def stats(self):
+        """
+        Get how full the table is and how much it has thrown away.
+
+        Returns:
+        dict: size, capacity, occupancy (size / capacity), evictions and
+              rejected inserts.
+        """
+        return {
+            "size": self.size,
+            "capacity": self.capacity(),
+            "occupancy": self.size / self.capacity(),
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+        }
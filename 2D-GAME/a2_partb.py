@@ -1,6 +1,17 @@
 # Main Author: [MOHAMMED ZAID SHABBIR KHAN HAKIM]
 # Main Reviewer: [Reviewer's Name]
 
+import time
+
+from a2_parta import HashTable
+from flat_board import FlatBoard
+from symmetry import symmetries, unique_moves, board_keys, update_keys, transform_move, inverse
+from zobrist import ZOBRIST
+
+# The rule functions below work on lists of lists. Any other board type
+# (FlatBoard, BoardState) provides the same operations as methods and the
+# functions hand the call over to it.
+
 # This function duplicates and returns the board.
 # It is useful for making non-destructive changes to the board state.
 def copy_board(board):
@@ -13,6 +24,8 @@ def copy_board(board):
     Returns:
     list of list of int: A deep copy of the board.
     """
+    if not isinstance(board, list):
+        return board.copy()
     current_board = []
     height = len(board)
     for i in range(height):
@@ -32,6 +45,8 @@ def evaluate_board(board, player):
     float: A positive score if the board is favorable to the player, 
            negative if unfavorable, or infinity if it's a winning/losing board.
     """
+    if not isinstance(board, list):
+        return board.evaluate(player)
     score = 0
     for row in board:
         for cell in row:
@@ -46,10 +61,63 @@ def evaluate_board(board, player):
         return float('-inf')
     return score
 
+# This function evaluates many boards with one vectorized computation.
+def evaluate_boards(boards, player):
+    """
+    Evaluate many boards at once, scoring each exactly like evaluate_board.
+    
+    Parameters:
+    boards (list of boards or numpy.ndarray): Boards of the same shape, as
+        lists of lists or FlatBoards, or already stacked into an array of
+        shape (number of boards, rows, cols).
+    player (int): The player for whom the evaluation is being performed (1 or -1).
+    
+    Returns:
+    list of float: The score of each board, in order.
+    """
+    # numpy is imported on first use; it takes longer to import than the game
+    try:
+        import numpy as np
+    except ImportError:
+        return [evaluate_board(board, player) for board in boards]
+    if len(boards) == 0:
+        return []
+    if isinstance(boards, np.ndarray):
+        stack = boards
+    else:
+        stack = np.array([board if isinstance(board, list) else
+                          np.frombuffer(board.cells, dtype=np.int8).reshape(board.rows, board.cols)
+                          if isinstance(board, FlatBoard) else board.to_list() for board in boards])
+    mine = stack == player
+    theirs = stack == -player
+    empty = stack == 0
+    score = mine.sum(axis=(1, 2)) - theirs.sum(axis=(1, 2))
+    # a win when every piece on the board is a single piece of the player
+    won = (mine | empty).all(axis=(1, 2))
+    lost = (theirs | empty).all(axis=(1, 2))
+    return np.where(won, np.inf, np.where(lost, -np.inf, score)).tolist()
+
+# Search algorithms GameTree can use to pick its move.
+SEARCH_MODES = ("minimax", "alphabeta", "streaming")
+
+# Kinds of score stored in the transposition table.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Deepest iteration iterative_deepening will start, whatever the budget.
+MAX_SEARCH_DEPTH = 64
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out."""
+
+class TooManyNodes(Exception):
+    """Raised when a search would keep more nodes alive than it is allowed to."""
+
 # This class represents the game tree used for determining the best move.
 class GameTree:
     class Node:
-        def __init__(self, board, depth, player, tree_height=4):
+        def __init__(self, board, depth, player, tree_height=4, tree=None, lazy=False):
             """
             Initialize a Node in the game tree.
             
@@ -58,14 +126,19 @@ class GameTree:
             depth (int): The depth of this node in the game tree.
             player (int): The player whose move is being simulated (1 or -1).
             tree_height (int): The maximum height of the game tree.
+            tree (GameTree): The tree that counts live nodes, if any.
+            lazy (bool): Do not expand the children now; use iter_children.
             """
             self.board = board
             self.depth = depth
             self.player = player
             self.children = []
             self.score = None
+            self.tree = tree
+            if tree is not None:
+                tree.add_live_node()
 
-            if depth < tree_height:
+            if depth < tree_height and not lazy:
                 self.expand_children(tree_height)
 
         def expand_children(self, tree_height):
@@ -78,24 +151,200 @@ class GameTree:
             moves = possible_moves(self.board, self.player)
             for move in moves:
                 new_board = make_move(self.board, move, self.player)
-                child = GameTree.Node(new_board, self.depth + 1, -self.player, tree_height)
+                child = GameTree.Node(new_board, self.depth + 1, -self.player, tree_height, self.tree)
                 self.children.append(child)
 
-            if not self.children:
+            if self.tree is not None and self.tree.batch_eval:
+                # Children without moves were left unscored; score them together
+                ended = [child for child in self.children
+                         if not child.children and child.depth < tree_height]
+                if ended:
+                    scores = evaluate_boards([child.board for child in ended], -self.player)
+                    for child, score in zip(ended, scores):
+                        child.score = score
+            elif not self.children:
                 self.score = evaluate_board(self.board, self.player)
 
-    def __init__(self, board, player, tree_height=4):
+        def iter_children(self):
+            """
+            Generate the children one at a time instead of keeping them all.
+            
+            Returns:
+            generator: Unexpanded child nodes, in possible_moves order.
+            """
+            for move in possible_moves(self.board, self.player):
+                new_board = make_move(self.board, move, self.player)
+                yield GameTree.Node(new_board, self.depth + 1, -self.player, 0, self.tree, lazy=True)
+
+    def __init__(self, board, player, tree_height=4, search="minimax",
+                 transposition=False, table=None, deadline=None, node_limit=None,
+                 max_live_nodes=None, flat=False, batch_eval=False, root_moves=None,
+                 stop=None, symmetry=False, reduce_moves=False):
         """
         Initialize the GameTree with a root node and build the tree.
         
         Parameters:
-        board (list of list of int): The initial board state.
+        board (list of list of int): The initial board state, or a FlatBoard
+                                     or BoardState to search on that type.
         player (int): The player for whom the tree is being built (1 or -1).
         tree_height (int): The maximum height of the game tree.
+        search (str): "minimax" builds the full tree and scores every node,
+                      "alphabeta" expands children only as needed and prunes
+                      branches that cannot change the chosen move,
+                      "streaming" scores every node like minimax but only
+                      keeps the nodes on the current path alive.
+        transposition (bool): Cache alpha-beta results by Zobrist hash so
+                              positions reached by different move orders
+                              are only searched once.
+        table (HashTable): Transposition table to use instead of a new one,
+                           e.g. to share results between searches.
+        deadline (float): time.perf_counter() value at which the search
+                          gives up by raising SearchTimeout.
+        node_limit (int): Number of nodes after which the search gives up
+                          by raising SearchTimeout.
+        max_live_nodes (int): Most nodes the search may keep in memory at
+                              once, TooManyNodes is raised instead of
+                              going over it.
+        flat (bool): Search on FlatBoard copies of the board instead of
+                     lists of lists.
+        batch_eval (bool): In minimax mode, score the children of a node
+                           that have no moves with one evaluate_boards call
+                           instead of one evaluate_board call each.
+        root_moves (list of tuple): In alphabeta mode, only search these
+                                    root moves, in this order.
+        stop (threading.Event): The search gives up by raising SearchTimeout
+                                once this is set, e.g. from another thread.
+        symmetry (bool): In alphabeta mode, search one root move of each
+                         set of moves a symmetry of the board makes
+                         equivalent, and key the transposition table by
+                         the canonical image of each position so mirror
+                         images share their entries.
+        reduce_moves (bool): In alphabeta mode, search one move of each
+                             group of equivalent moves, see
+                             reduce_equivalent. Faster, but approximate.
         """
-        self.root = self.Node(board, 0, player, tree_height)
+        if search not in SEARCH_MODES:
+            raise ValueError("unknown search mode: {}".format(search))
+        if table is not None:
+            transposition = True
+        if transposition and search != "alphabeta":
+            raise ValueError("a transposition table needs the alphabeta search")
+        if (deadline is not None or node_limit is not None or stop is not None) and search != "alphabeta":
+            raise ValueError("search budgets need the alphabeta search")
+        if batch_eval and search != "minimax":
+            raise ValueError("batched evaluation needs the minimax search")
+        if root_moves is not None and search != "alphabeta":
+            raise ValueError("root_moves needs the alphabeta search")
+        if symmetry and search != "alphabeta":
+            raise ValueError("symmetry needs the alphabeta search")
+        if reduce_moves and search != "alphabeta":
+            raise ValueError("reduce_moves needs the alphabeta search")
+        if flat and not isinstance(board, FlatBoard):
+            board = FlatBoard.from_list(board)
         self.player = player
-        self.minimax(self.root, player)
+        self.tree_height = tree_height
+        self.search = search
+        self.nodes = 0
+        self.table = None
+        if transposition:
+            self.table = table if table is not None else HashTable()
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.deadline = deadline
+        self.node_limit = node_limit
+        self.stop = stop
+        self.max_live_nodes = max_live_nodes
+        self.batch_eval = batch_eval
+        self.root_moves = root_moves
+        self.reduce_moves = reduce_moves
+        # Symmetries of the board shape, None when they are not used
+        self.symmetries = None
+        if symmetry:
+            shape = board if isinstance(board, list) else board.to_list()
+            self.rows, self.cols = len(shape), len(shape[0])
+            self.symmetries = symmetries(self.rows, self.cols)
+        # Score and root move behind best_move, set by the alphabeta search
+        self.best_score = None
+        self.best_root_move = None
+        self.live_nodes = 0
+        self.peak_live_nodes = 0
+        if search == "alphabeta":
+            # Alpha-beta keeps one board per level of the current path alive
+            if max_live_nodes is not None and tree_height + 1 > max_live_nodes:
+                raise TooManyNodes("alphabeta needs {} live nodes".format(tree_height + 1))
+            # The root is kept unexpanded; children are generated on demand.
+            self.root = self.Node(board, 0, player, 0)
+            self.best_move = self.alphabeta_root()
+        elif search == "streaming":
+            self.root = self.Node(board, 0, player, 0, self, lazy=True)
+            self.best_move = self.streaming_root()
+        else:
+            self.root = self.Node(board, 0, player, tree_height, self)
+            if batch_eval and not self.root.children and tree_height > 0:
+                # The root has no parent to score it with its siblings
+                self.root.score = evaluate_board(board, player)
+            self.minimax(self.root, player)
+
+    def add_live_node(self):
+        """
+        Count a newly created node against max_live_nodes.
+        """
+        if self.max_live_nodes is not None and self.live_nodes >= self.max_live_nodes:
+            raise TooManyNodes("more than {} live nodes".format(self.max_live_nodes))
+        self.live_nodes += 1
+        self.nodes += 1
+        self.peak_live_nodes = max(self.peak_live_nodes, self.live_nodes)
+
+    def streaming_root(self):
+        """
+        Pick the root move scoring one child subtree at a time.
+        
+        Returns:
+        tuple: The same move get_move picks from the fully built tree.
+        """
+        if self.tree_height <= 0:
+            return None
+        best_score = float('inf')
+        best_move = None
+        for child in self.root.iter_children():
+            score = self.streaming(child)
+            if score < best_score:
+                best_score = score
+                best_move = extract_move(self.root.board, child.board)
+            self.live_nodes -= 1
+        return best_move
+
+    def streaming(self, node):
+        """
+        Score a node like minimax, dropping each child once it is scored.
+        
+        Parameters:
+        node (Node): An unexpanded node.
+        
+        Returns:
+        float: The minimax score of the node.
+        """
+        maximizing = node.player == self.player
+        if node.depth >= self.tree_height:
+            node.score = -float('inf') if maximizing else float('inf')
+            return node.score
+
+        value = None
+        for child in node.iter_children():
+            score = self.streaming(child)
+            # The child's subtree is gone already, only its score is kept
+            self.live_nodes -= 1
+            if value is None:
+                value = score
+            elif maximizing:
+                value = max(value, score)
+            else:
+                value = min(value, score)
+
+        if value is None:
+            value = evaluate_board(node.board, node.player)
+        node.score = value
+        return value
 
     def minimax(self, node, player):
         """
@@ -126,6 +375,214 @@ class GameTree:
             node.score = min_eval
             return min_eval
 
+    def alphabeta_root(self):
+        """
+        Pick the root move with an alpha-beta search.
+        
+        Returns:
+        tuple: The same move get_move picks from the fully built tree, i.e.
+               the first child whose minimax score is strictly the lowest.
+        """
+        if self.tree_height <= 0:
+            return None
+        board = self.root.board
+        key = None
+        if self.table is not None:
+            if self.symmetries is not None:
+                key = tuple(self.position_key(h, self.player) for h in board_keys(board, self.symmetries))
+            else:
+                key = self.position_key(ZOBRIST.hash_board(board), self.player)
+        moves = self.root_moves
+        if moves is None:
+            moves = possible_moves(board, self.player, self.reduce_moves)
+            if self.symmetries is not None:
+                moves = unique_moves(board, moves)
+        best_score = float('inf')
+        best_move = None
+        for move in moves:
+            new_board, new_key = self.child(board, move, self.player, key)
+            # Only a score strictly below best_score can change the answer,
+            # so best_score is the beta bound for the child's search.
+            score = self.alphabeta(new_board, 1, -self.player, -float('inf'), best_score, new_key)
+            if score < best_score:
+                best_score = score
+                best_move = extract_move(board, new_board)
+                self.best_root_move = move
+            if best_score == -float('inf'):
+                break
+        self.best_score = best_score
+        return best_move
+
+    def alphabeta(self, board, depth, player, alpha, beta, key=None):
+        """
+        Fail-soft alpha-beta search that scores nodes exactly like minimax.
+        
+        Parameters:
+        board (list of list of int): The board at this node.
+        depth (int): The depth of this node in the game tree.
+        player (int): The player to move at this node (1 or -1).
+        alpha (float): Score the maximizing player is already assured of.
+        beta (float): Score the minimizing player is already assured of.
+        key (int): Transposition key of this node, None when there is no table.
+                   With symmetry, a tuple of the keys of its images.
+        
+        Returns:
+        float: The minimax score of the node if it lies inside (alpha, beta),
+               otherwise a bound on the wrong side of the window.
+        """
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+        maximizing = player == self.player
+        if depth >= self.tree_height:
+            # Nodes on the horizon are never expanded, so minimax scores them
+            # as an empty max or min node.
+            return -float('inf') if maximizing else float('inf')
+
+        remaining = self.tree_height - depth
+        hint = None
+        sym = None
+        if key is not None:
+            table_key, sym = self.canonical_key(key)
+            entry = self.table.search(table_key)
+            if entry is None:
+                self.tt_misses += 1
+            else:
+                self.tt_hits += 1
+                entry_depth, entry_score, bound, hint = entry
+                if sym is not None and hint is not None:
+                    hint = transform_move(hint, inverse(sym), self.rows, self.cols)
+                if entry_depth >= remaining:
+                    if bound == EXACT:
+                        return entry_score
+                    if bound == LOWER_BOUND and entry_score >= beta:
+                        return entry_score
+                    if bound == UPPER_BOUND and entry_score <= alpha:
+                        return entry_score
+
+        # One ply from the horizon a node is cut at its first child anyway,
+        # so reducing its moves would cost more than it saves
+        moves = possible_moves(board, player, self.reduce_moves and remaining >= 2)
+        if not moves:
+            return evaluate_board(board, player)
+        if hint in moves:
+            # Try the best move found earlier first; it is the likeliest cutoff
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        alpha_start, beta_start = alpha, beta
+        best = moves[0]
+        if maximizing:
+            value = -float('inf')
+            for move in moves:
+                new_board, new_key = self.child(board, move, player, key)
+                score = self.alphabeta(new_board, depth + 1, -player, alpha, beta, new_key)
+                if score > value:
+                    value = score
+                    best = move
+                if value >= beta:
+                    break
+                alpha = max(alpha, value)
+        else:
+            value = float('inf')
+            for move in moves:
+                new_board, new_key = self.child(board, move, player, key)
+                score = self.alphabeta(new_board, depth + 1, -player, alpha, beta, new_key)
+                if score < value:
+                    value = score
+                    best = move
+                if value <= alpha:
+                    break
+                beta = min(beta, value)
+
+        if key is not None:
+            if value <= alpha_start:
+                bound = UPPER_BOUND
+            elif value >= beta_start:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            if sym is not None:
+                # Entries hold the move as it is on the canonical image
+                best = transform_move(best, sym, self.rows, self.cols)
+            self.store(table_key, (remaining, value, bound, best))
+        return value
+
+    def child(self, board, move, player, key):
+        """
+        Make a move and work out the transposition key of the new position.
+        
+        Parameters:
+        board (list of list of int): The board before the move.
+        move (tuple): The row and column of the move.
+        player (int): The player making the move (1 or -1).
+        key (int): Transposition key of the board, None when there is no table.
+                   With symmetry, a tuple of the keys of its images.
+        
+        Returns:
+        tuple: The new board and its key (None when there is no table).
+        """
+        if key is None:
+            return make_move(board, move, player), None
+        trail = []
+        new_board = make_move(board, move, player, trail)
+        if self.symmetries is not None:
+            keys = update_keys(key, trail, self.symmetries, self.rows, self.cols)
+            return new_board, tuple(k ^ ZOBRIST.side for k in keys)
+        # The side to move flips along with the changed cells
+        return new_board, ZOBRIST.update(key, trail) ^ ZOBRIST.side
+
+    def canonical_key(self, key):
+        """
+        Get the key a position is stored under in the transposition table.
+        
+        Parameters:
+        key (int): Transposition key of the position, or with symmetry the
+                   tuple of the keys of its images.
+        
+        Returns:
+        tuple: The table key and the symmetry that maps the position to the
+               image it is stored as, None without symmetry. The smallest
+               key of the images is the same for every mirror image.
+        """
+        if self.symmetries is None:
+            return key, None
+        index = min(range(len(key)), key=key.__getitem__)
+        return key[index], self.symmetries[index]
+
+    def position_key(self, board_hash, player):
+        """
+        Combine a board hash with the side to move and the searching player.
+        
+        Parameters:
+        board_hash (int): Zobrist hash of the board.
+        player (int): The player to move (1 or -1).
+        
+        Returns:
+        int: The transposition key of the position.
+        """
+        key = board_hash
+        if player == -1:
+            key ^= ZOBRIST.side
+        if self.player == -1:
+            key ^= ZOBRIST.root_side
+        return key
+
+    def store(self, key, entry):
+        """
+        Save a search result in the transposition table.
+        
+        Parameters:
+        key (int): Transposition key of the position.
+        entry (tuple): (depth searched, score, bound kind, best move).
+        """
+        if not self.table.insert(key, entry):
+            self.table.modify(key, entry)
+
     def get_move(self):
         """
         Get the best move based on the current game tree.
@@ -133,6 +590,9 @@ class GameTree:
         Returns:
         tuple: The row and column of the best move determined by the minimax algorithm.
         """
+        if self.search != "minimax":
+            return self.best_move
+
         best_score = float('inf')
         best_move = None
 
@@ -143,8 +603,59 @@ class GameTree:
                 best_move = extract_move(self.root.board, child.board)
         return best_move
 
+# Function to search deeper and deeper until the budget runs out.
+def iterative_deepening(board, player, time_limit=None, node_limit=None, max_depth=None, table=None,
+                        symmetry=False, reduce_moves=False, stop=None):
+    """
+    Run alpha-beta searches of height 1, 2, 3... until the budget runs out.
+    
+    Parameters:
+    board (list of list of int): The current game board.
+    player (int): The player to find a move for (1 or -1).
+    time_limit (float): Seconds the whole search may take.
+    node_limit (int): Nodes the whole search may visit.
+    max_depth (int): Height of the last iteration, unlimited when None.
+    table (HashTable): Transposition table shared by the iterations.
+    symmetry (bool): Use the board's symmetries, see GameTree.
+    reduce_moves (bool): Search one of each group of equivalent moves, see GameTree.
+    stop (threading.Event): Ends the search like the budgets do once set.
+    
+    Returns:
+    tuple: The move from the deepest completed iteration that found one and
+           the height of that iteration. When no iteration finished the
+           first possible move is returned with height 0, and (None, 0)
+           when the player has no move at all.
+    """
+    if time_limit is None and node_limit is None and max_depth is None:
+        raise ValueError("iterative deepening needs a time, node or depth limit")
+    moves = possible_moves(board, player)
+    if not moves:
+        return None, 0
+    deadline = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+    if table is None:
+        table = HashTable()
+    last = MAX_SEARCH_DEPTH if max_depth is None else min(max_depth, MAX_SEARCH_DEPTH)
+
+    best_move, best_depth = moves[0], 0
+    nodes = 0
+    for depth in range(1, last + 1):
+        budget = None if node_limit is None else node_limit - nodes
+        try:
+            tree = GameTree(board, player, depth, search="alphabeta", table=table,
+                            deadline=deadline, node_limit=budget, stop=stop, symmetry=symmetry,
+                            reduce_moves=reduce_moves)
+        except SearchTimeout:
+            break
+        nodes += tree.nodes
+        # Odd heights end on the opponent's horizon and may not pick a move
+        if tree.get_move() is not None:
+            best_move, best_depth = tree.get_move(), depth
+    return best_move, best_depth
+
 # Function to apply a move to the board and handle any overflow.
-def make_move(board, move, player):
+def make_move(board, move, player, trail=None):
     """
     Make a move on the board and apply overflow rules.
     
@@ -152,18 +663,24 @@ def make_move(board, move, player):
     board (list of list of int): The current game board.
     move (tuple): The row and column where the move is to be made.
     player (int): The player making the move (1 or -1).
+    trail (list): If given, (row, col, old value, new value) is appended
+                  for every cell write, in order.
     
     Returns:
     list of list of int: The updated board after making the move.
     """
+    if not isinstance(board, list):
+        return board.make_move(move, player, trail)
     new_board = copy_board(board)
     i, j = move
+    if trail is not None:
+        trail.append((i, j, new_board[i][j], new_board[i][j] + player))
     new_board[i][j] += player
-    overflow(new_board, i, j, player)
+    overflow(new_board, i, j, player, trail)
     return new_board
 
 # Function to handle overflow mechanics on the board.
-def overflow(board, i, j, player):
+def overflow(board, i, j, player, trail=None):
     """
     Handle the overflow of pieces on the board after a move.
     
@@ -172,6 +689,8 @@ def overflow(board, i, j, player):
     i (int): The row of the piece to check for overflow.
     j (int): The column of the piece to check for overflow.
     player (int): The player whose piece is overflowing (1 or -1).
+    trail (list): If given, every cell write is recorded as
+                  (row, col, old value, new value).
     """
     neighbors = [(i-1, j), (i+1, j), (i, j-1), (i, j+1)]
     overflow_count = 4
@@ -181,28 +700,96 @@ def overflow(board, i, j, player):
             overflow_count -= 1
 
     if abs(board[i][j]) >= overflow_count:
+        if trail is not None:
+            trail.append((i, j, board[i][j], 0))
         board[i][j] = 0
         for x, y in neighbors:
             if 0 <= x < len(board) and 0 <= y < len(board[0]):
+                if trail is not None:
+                    trail.append((x, y, board[x][y], board[x][y] + player))
                 board[x][y] += player
                 if abs(board[x][y]) >= 4:
-                    overflow(board, x, y, player)
+                    overflow(board, x, y, player, trail)
 
 # Function to determine all possible valid moves for a player.
-def possible_moves(board, player):
+def possible_moves(board, player, reduce_moves=False):
     """
     Get a list of all possible valid moves for the player.
     
     Parameters:
     board (list of list of int): The current game board.
     player (int): The player for whom to generate the moves (1 or -1).
+    reduce_moves (bool): Keep one move of each group of equivalent moves,
+                         see reduce_equivalent.
     
     Returns:
     list of tuple: A list of valid moves (row, column) on the board.
     """
+    if not isinstance(board, list):
+        moves = board.possible_moves(player)
+        if reduce_moves:
+            moves = reduce_equivalent(board.to_list(), moves)
+        return moves
     moves = [(i, j) for i in range(len(board)) for j in range(len(board[0])) if board[i][j] == 0 or board[i][j] == player]
+    if reduce_moves:
+        moves = reduce_equivalent(board, moves)
     return moves
 
+# Function to drop moves that cannot be told apart from an earlier one.
+def reduce_equivalent(board, moves):
+    """
+    Keep only the first of the moves to isolated empty cells of the same
+    capacity.
+    
+    A piece played on an empty cell none of whose neighbours hold a piece
+    overflows at once onto those neighbours, so every such cell with the
+    same number of neighbours leaves a board evaluate_board scores the
+    same. Searching one of them is enough early in the game, when most
+    cells are like this. The moves left are not always equivalent deeper
+    in the tree, so a search on them is an approximation.
+    
+    Parameters:
+    board (list of list of int): The current game board.
+    moves (list of tuple): The moves, in search order.
+    
+    Returns:
+    list of tuple: The moves left, in the same order.
+    """
+    neighbours = cell_neighbours(len(board), len(board[0]))
+    # Cells next to a piece; the other empty cells are isolated
+    crowded = set()
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell != 0:
+                crowded.update(neighbours[i][j])
+    kept = set()  # capacities of the isolated cells already kept
+    result = []
+    for move in moves:
+        i, j = move
+        if board[i][j] == 0 and move not in crowded:
+            capacity = len(neighbours[i][j])
+            if capacity in kept:
+                continue
+            kept.add(capacity)
+        result.append(move)
+    return result
+
+# Neighbour lists made by cell_neighbours, by board shape
+neighbour_cache = {}
+
+def cell_neighbours(rows, cols):
+    """
+    Get the cells next to every cell of a board shape.
+    
+    Returns:
+    list of list of list of tuple: The neighbours of cell (i, j) at [i][j].
+    """
+    if (rows, cols) not in neighbour_cache:
+        neighbour_cache[(rows, cols)] = [[[(x, y) for x, y in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+                                           if 0 <= x < rows and 0 <= y < cols]
+                                          for j in range(cols)] for i in range(rows)]
+    return neighbour_cache[(rows, cols)]
+
 # Function to extract the move made by comparing the original and new boards.
 def extract_move(original_board, new_board):
     """
@@ -215,6 +802,8 @@ def extract_move(original_board, new_board):
     Returns:
     tuple: The row and column where the move was made.
     """
+    if not isinstance(original_board, list):
+        return original_board.extract_move(new_board)
     for i in range(len(original_board)):
         for j in range(len(original_board[0])):
             if original_board[i][j] != new_board[i][j]:
@@ -0,0 +1,198 @@
+# Headless self-play arena.
+#
+# Plays bots against each other on the GameState that game.py draws, but
+# without the window, the frame delay or the overflow animation, spreading
+# the games over worker processes. Any class whose instances have get_play(board)
+# can play; player 1 is built from bot1 and player 2 from bot2.
+#
+# To use this, run: python arena.py --games 200 --workers 8
+# Bots can be given as module:Class, e.g. --bot1 player1:PlayerOne
+
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_state import GameState, GRID_SIZE
+from player1 import PlayerOne
+from player2 import PlayerTwo
+
+ROWS, COLS = GRID_SIZE
+
+
+def play_game(bot1, bot2, seed=0, random_plies=0, max_moves=500, rows=ROWS, cols=COLS):
+    """
+    Play one game between two bot classes.
+
+    Parameters:
+    bot1 (class): Bot class for player 1, built with no arguments.
+    bot2 (class): Bot class for player 2, built with no arguments.
+    seed (int): Seed for the random opening moves.
+    random_plies (int): Number of random moves played before the bots take
+                        over, so that deterministic bots play varied games.
+    max_moves (int): Moves after which the game is called a draw.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    dict: winner (1, -1 or 0 for a draw), moves played, forfeit (True when
+          the loser made an invalid move) and the seconds each get_play
+          call took per player.
+    """
+    rng = random.Random(seed)
+    bots = {1: bot1(), -1: bot2()}
+    latencies = {1: [], -1: []}
+    game = GameState(cols, rows)
+    forfeit = False
+    moves = 0
+    while moves < max_moves and game.check_win() == 0:
+        player = game.player()
+        if moves < random_plies:
+            move = rng.choice([(i, j) for i in range(rows) for j in range(cols) if game.valid_move(i, j)])
+        else:
+            start = time.perf_counter()
+            move = bots[player].get_play(game.board.get_board())
+            latencies[player].append(time.perf_counter() - start)
+        if move is None or len(move) != 2 or not game.valid_move(*move):
+            # game.py gives the game to the other player
+            game.forfeit()
+            forfeit = True
+            break
+        game.play(*move)
+        moves += 1
+        # game.py checks for a winner after every wave of the overflow
+        while game.step():
+            if game.check_win() != 0:
+                break
+    return {"winner": game.check_win(), "moves": moves, "forfeit": forfeit,
+            "latencies": [latencies[1], latencies[-1]]}
+
+
+def play_game_job(job):
+    # Unpack the arguments of play_game; used by the process pool
+    return play_game(*job)
+
+
+def percentile(values, p):
+    """
+    Get the p-th percentile of some values by the nearest-rank method.
+
+    Returns:
+    float: The percentile, or 0.0 when there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_arena(bot1=PlayerOne, bot2=PlayerTwo, games=100, workers=None, seed=0,
+              random_plies=2, max_moves=500, rows=ROWS, cols=COLS):
+    """
+    Play many games, in parallel, and summarize the results.
+
+    Parameters:
+    bot1 (class): Bot class for player 1.
+    bot2 (class): Bot class for player 2.
+    games (int): Number of games.
+    workers (int): Worker processes, one per CPU when None, in process
+                   when 1.
+    seed (int): Game i uses seed + i for its random opening.
+    random_plies (int): Random opening moves per game.
+    max_moves (int): Moves after which a game is a draw.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    dict: Win, draw and forfeit counts and rates, games per second, the
+          average game length and per-move latency percentiles per player.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(bot1, bot2, seed + i, random_plies, max_moves, rows, cols) for i in range(games)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_game_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_game_job, jobs, chunksize=max(1, games // (workers * 4))))
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "games": games,
+        "bot1": bot1.__name__,
+        "bot2": bot2.__name__,
+        "p1_wins": sum(1 for r in results if r["winner"] == 1),
+        "p2_wins": sum(1 for r in results if r["winner"] == -1),
+        "draws": sum(1 for r in results if r["winner"] == 0),
+        "forfeits": sum(1 for r in results if r["forfeit"]),
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed > 0 else 0.0,
+        "average_moves": sum(r["moves"] for r in results) / games if games else 0.0,
+    }
+    summary["p1_win_rate"] = summary["p1_wins"] / games if games else 0.0
+    summary["p2_win_rate"] = summary["p2_wins"] / games if games else 0.0
+    for side in range(2):
+        times = [t for r in results for t in r["latencies"][side]]
+        summary["p{}_latency".format(side + 1)] = {
+            "moves": len(times),
+            "p50": percentile(times, 50),
+            "p90": percentile(times, 90),
+            "p99": percentile(times, 99),
+            "max": max(times) if times else 0.0,
+        }
+    return summary
+
+
+def format_report(summary):
+    """
+    Format an arena summary for printing.
+
+    Returns:
+    str: The report.
+    """
+    lines = [
+        "{bot1} vs {bot2}: {games} games in {seconds:.2f}s ({games_per_second:.1f} games/s)".format(**summary),
+        "P1 wins {p1_wins} ({p1_win_rate:.1%}), P2 wins {p2_wins} ({p2_win_rate:.1%}), "
+        "draws {draws}, forfeits {forfeits}, {average_moves:.1f} moves/game".format(**summary),
+    ]
+    for side in ("p1", "p2"):
+        latency = summary[side + "_latency"]
+        lines.append("{} move latency over {} moves: p50 {:.2f}ms p90 {:.2f}ms p99 {:.2f}ms max {:.2f}ms".format(
+            side.upper(), latency["moves"], latency["p50"] * 1000, latency["p90"] * 1000,
+            latency["p99"] * 1000, latency["max"] * 1000))
+    return "\n".join(lines)
+
+
+def load_bot(spec):
+    """
+    Load a bot class from a module:Class string.
+
+    Returns:
+    class: The bot class.
+    """
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError("bots are given as module:Class, got {}".format(spec))
+    return getattr(importlib.import_module(module), name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play bots against each other without the game window.")
+    parser.add_argument("--bot1", default="player1:PlayerOne", help="module:Class for player 1")
+    parser.add_argument("--bot2", default="player2:PlayerTwo", help="module:Class for player 2")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--random-plies", type=int, default=2, help="random opening moves per game")
+    parser.add_argument("--max-moves", type=int, default=500, help="moves before a game is a draw")
+    args = parser.parse_args(argv)
+    summary = run_arena(load_bot(args.bot1), load_bot(args.bot2), args.games, args.workers,
+                        args.seed, args.random_plies, args.max_moves)
+    print(format_report(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Random playouts of many games at once with numpy.
+#
+# N games are held as one (N, rows, cols) array and every step makes one
+# move in each game still running: a random legal cell is picked per game,
+# the piece is added and the overflow waves are run with a1_partd's
+# numpy_wave, which works on a whole stack of grids. Games that are over
+# are masked out of the following steps. The rules are the ones the game
+# is played by (a1_partd), so the outcomes are those of real games.
+#
+# To use this, run: python batch_playout.py [--games 10000]
+
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from a1_partd import check_wave_cap, numpy_capacity, numpy_wave
+
+# Moves after which a playout that has not ended is stopped
+MAX_MOVES = 200
+
+
+def winners(boards):
+    """
+    Find the winner of each game, like BoardState.winner.
+
+    Parameters:
+    boards (numpy.ndarray): Boards of shape (N, rows, cols).
+
+    Returns:
+    numpy.ndarray: Per game -1 if player 1 has no cells left, 1 if player 2
+                   has none left, 0 otherwise.
+    """
+    has_p1 = (boards > 0).any(axis=(1, 2))
+    has_p2 = (boards < 0).any(axis=(1, 2))
+    return np.where(~has_p1, -1, np.where(~has_p2, 1, 0)).astype(np.int8)
+
+
+def settle(boards, capacity):
+    """
+    Run the overflow waves of every game until each one settles.
+
+    Parameters:
+    boards (numpy.ndarray): Boards of shape (N, rows, cols), updated in place.
+    capacity (numpy.ndarray): Pieces at which each cell overflows.
+
+    Returns:
+    numpy.ndarray: The number of waves each game took.
+
+    Raises:
+    RuntimeError: A game is still overflowing after the overflow engines'
+                  wave cap, see a1_partd.check_wave_cap.
+    """
+    rows, cols = boards.shape[1:]
+    waves = np.zeros(len(boards), dtype=np.int32)
+    running = np.arange(len(boards))
+    steps = 0
+    while len(running):
+        a = boards[running]
+        over = np.abs(a) >= capacity
+        # A game stops when nothing overflows or one side has every piece
+        going = over.any(axis=(1, 2)) & (a > 0).any(axis=(1, 2)) & (a < 0).any(axis=(1, 2))
+        running = running[going]
+        if not len(running):
+            break
+        check_wave_cap(steps, rows, cols)
+        boards[running] = numpy_wave(a[going], over[going])
+        waves[running] += 1
+        steps += 1
+    return waves
+
+
+def play_moves(boards, moves, players):
+    """
+    Make one move in each game.
+
+    Parameters:
+    boards (numpy.ndarray): Boards of shape (N, rows, cols), updated in place.
+    moves (numpy.ndarray): The cell of each move, as row * cols + col.
+    players (numpy.ndarray): The player making each move (1 or -1).
+
+    Returns:
+    numpy.ndarray: The number of overflow waves each move caused.
+    """
+    rows, cols = boards.shape[1:]
+    flat = boards.reshape(len(boards), rows * cols)
+    flat[np.arange(len(boards)), moves] += players
+    return settle(boards, numpy_capacity(rows, cols))
+
+
+def random_playouts(boards, players, max_moves=MAX_MOVES, seed=None):
+    """
+    Finish games with random legal moves, all games at once.
+
+    Parameters:
+    boards (array-like): One board (rows, cols) or a stack (N, rows, cols).
+    players (int or array-like): The player to move in each game.
+    max_moves (int): Moves after which a game still running is stopped.
+    seed (int): Seed for the moves.
+
+    Returns:
+    tuple: (outcomes, moves, final boards). outcomes holds the winner of
+           each game, 1 or -1, or 0 for games stopped by max_moves; moves
+           holds the number of moves each game took.
+    """
+    if np is None:
+        raise ImportError('batch playouts need numpy')
+    rng = np.random.default_rng(seed)
+    boards = np.array(boards, dtype=np.int32)
+    if boards.ndim == 2:
+        boards = boards[None]
+    count, rows, cols = boards.shape
+    to_move = np.broadcast_to(np.asarray(players, dtype=np.int32), (count,)).copy()
+    outcomes = winners(boards)
+    moves = np.zeros(count, dtype=np.int32)
+    running = np.nonzero(outcomes == 0)[0]
+
+    for _ in range(max_moves):
+        if not len(running):
+            break
+        a = boards[running]
+        player = to_move[running]
+        # A player may play empty cells and their own
+        legal = (a * player[:, None, None] >= 0).reshape(len(running), rows * cols)
+        # The legal cell with the highest random key is a uniform pick
+        keys = np.where(legal, rng.random(legal.shape), -1.0)
+        play_moves(a, keys.argmax(axis=1), player)
+        boards[running] = a
+        moves[running] += 1
+        to_move[running] = -player
+        ended = winners(a)
+        outcomes[running] = ended
+        running = running[ended == 0]
+    return outcomes, moves, boards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time random playouts from the starting position.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    start = np.zeros((args.rows, args.cols), dtype=np.int32)
+    start[0, 0] = 1
+    start[-1, -1] = -1
+    boards = np.broadcast_to(start, (args.games, args.rows, args.cols))
+    begin = time.perf_counter()
+    outcomes, moves, _ = random_playouts(boards, 1, args.max_moves, args.seed)
+    elapsed = time.perf_counter() - begin
+    print("{} playouts in {:.2f}s ({:.0f} playouts/s, {:.0f} moves/s)".format(
+        args.games, elapsed, args.games / elapsed, moves.sum() / elapsed))
+    print("P1 wins {}, P2 wins {}, unfinished {}, {:.1f} moves/game".format(
+        (outcomes == 1).sum(), (outcomes == -1).sum(), (outcomes == 0).sum(), moves.mean()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,431 @@
+# Benchmarks for the rules engines, the search and the hash table.
+#
+# Every workload is built from a fixed seed, so two runs on the same machine
+# time exactly the same boards and keys. Each benchmark reports operations
+# per second, the latency of single operations (p50/p90/p99/max), the peak
+# memory allocated while running it once and, for searches, nodes per
+# second (playouts per second for MCTS). Results can be saved as a JSON
+# baseline and later runs compared against it.
+#
+# To use this, run: python bench.py [--quick] [--save base.json] [--compare base.json]
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from a1_partc import Queue
+from a1_partd import overflow, OVERFLOW_ENGINES
+from a2_parta import HashTable, RobinHoodHashTable, BoundedHashTable
+from a2_partb import GameTree, make_move, possible_moves
+from board_state import BoardState
+from flat_board import FlatBoard
+from mcts_player import MCTSPlayer
+from batch_playout import random_playouts
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# A benchmark is slower than the baseline when its ops/sec dropped by more
+# than this fraction
+DEFAULT_THRESHOLD = 0.10
+
+
+def capacity(rows, cols, i, j):
+    # number of neighbours, the capacity a1_partd uses
+    return (i > 0) + (i < rows - 1) + (j > 0) + (j < cols - 1)
+
+
+def overflow_workload(rng, rows, cols, count):
+    """
+    Make boards that are one piece away from a chain reaction.
+
+    Parameters:
+    rng (random.Random): Source of randomness.
+    rows (int): Rows of the boards.
+    cols (int): Columns of the boards.
+    count (int): Number of boards.
+
+    Returns:
+    list of list of list of int: Boards in which every cell is under its
+                                 capacity except one, which has just reached it.
+    """
+    boards = []
+    for _ in range(count):
+        board = [[0] * cols for _ in range(rows)]
+        for i in range(rows):
+            for j in range(cols):
+                # keep plenty of room so the chain reaction settles
+                value = rng.randint(0, max(0, capacity(rows, cols, i, j) - 2))
+                board[i][j] = value * rng.choice((1, -1))
+        i = rng.randrange(rows)
+        j = rng.randrange(cols)
+        sign = -1 if board[i][j] < 0 else 1
+        board[i][j] = capacity(rows, cols, i, j) * sign
+        boards.append(board)
+    return boards
+
+
+def chain_workload(rng, rows, cols, count):
+    """
+    Make full boards on which one piece sets off a chain reaction that
+    sweeps the whole board, the long chains the numpy engine is for.
+
+    Parameters:
+    rng (random.Random): Source of randomness.
+    rows (int): Rows of the boards.
+    cols (int): Columns of the boards.
+    count (int): Number of boards.
+
+    Returns:
+    list of list of list of int: Boards in which every cell is one piece
+                                 under its capacity except one that has
+                                 reached it, and one opponent piece that
+                                 the chain captures.
+    """
+    boards = []
+    for _ in range(count):
+        sign = rng.choice((1, -1))
+        board = [[(capacity(rows, cols, i, j) - 1) * sign for j in range(cols)] for i in range(rows)]
+        i, j = rng.randrange(rows), rng.randrange(cols)
+        board[i][j] = capacity(rows, cols, i, j) * sign
+        while board[i][j] != (capacity(rows, cols, i, j) - 1) * sign:
+            i, j = rng.randrange(rows), rng.randrange(cols)
+        board[i][j] = -sign
+        boards.append(board)
+    return boards
+
+
+def position_workload(rng, rows, cols, count, plies):
+    """
+    Make game positions by playing random moves from the starting board.
+
+    Parameters:
+    rng (random.Random): Source of randomness.
+    rows (int): Rows of the boards.
+    cols (int): Columns of the boards.
+    count (int): Number of positions.
+    plies (int): Random moves played for each position.
+
+    Returns:
+    list of tuple: (board, player to move) per position.
+    """
+    positions = []
+    while len(positions) < count:
+        board = [[0] * cols for _ in range(rows)]
+        board[0][0] = 1
+        board[rows - 1][cols - 1] = -1
+        player = 1
+        for _ in range(plies):
+            moves = possible_moves(board, player)
+            if not moves:
+                break
+            board = make_move(board, rng.choice(moves), player)
+            player = -player
+        if possible_moves(board, player):
+            positions.append((board, player))
+    return positions
+
+
+def run_overflow(engine, boards, deltas=False):
+    def op(board):
+        overflow([row[:] for row in board], Queue(), engine, deltas)
+    return op, boards
+
+
+def run_make_move(kind, positions):
+    wrap = {"list": lambda board: board,
+            "flat": FlatBoard.from_list,
+            "state": lambda board: BoardState([row[:] for row in board])}[kind]
+    work = [(wrap(board), possible_moves(board, player), player) for board, player in positions]
+    def op(item):
+        board, moves, player = item
+        for move in moves:
+            make_move(board, move, player)
+    return op, work
+
+
+def run_search(search, depth, positions, reduce_moves=False):
+    def op(position):
+        board, player = position
+        tree = GameTree(board, player, depth, search=search, reduce_moves=reduce_moves)
+        tree.get_move()
+        return tree.nodes
+    return op, positions
+
+
+def run_mcts(iterations, positions, seed=0):
+    # the "nodes" of an MCTS move are its playouts
+    def op(position):
+        board, player = position
+        bot = MCTSPlayer(player, iterations=iterations, seed=seed)
+        bot.get_play(board)
+        return bot.playouts
+    return op, positions
+
+
+def run_batch_playouts(games, seed=0):
+    start = np.zeros((5, 6), dtype=np.int32)
+    start[0, 0] = 1
+    start[-1, -1] = -1
+    def op(boards):
+        random_playouts(boards, 1, seed=seed)
+    return op, [np.broadcast_to(start, (games, 5, 6))]
+
+
+def run_hash_table(keys, table_class=HashTable):
+    def op(batch):
+        table = table_class()
+        for key in batch:
+            table.insert(key, key)
+        for key in batch:
+            table.search(key)
+        for key in batch:
+            table.remove(key)
+    return op, [keys]
+
+
+def build_benchmarks(quick=False, seed=0):
+    """
+    Build the benchmark workloads.
+
+    Parameters:
+    quick (bool): Use fewer and smaller workloads, for a fast check.
+    seed (int): Seed for all workloads.
+
+    Returns:
+    list of tuple: (name, op, items, ops per item) per benchmark. op is
+                   called once per item; searches return their node count.
+    """
+    rng = random.Random(seed)
+    benchmarks = []
+
+    sizes = [(5, 6), (20, 20)] if quick else [(5, 6), (20, 20), (60, 60)]
+    for rows, cols in sizes:
+        boards = overflow_workload(rng, rows, cols, 10 if quick else 40)
+        for engine in sorted(OVERFLOW_ENGINES):
+            if engine == "numpy" and np is None:
+                continue
+            if engine == "recursive" and rows * cols > 400:
+                # deep chains overflow the recursion limit
+                continue
+            op, items = run_overflow(engine, boards)
+            benchmarks.append(("overflow/{}/{}x{}".format(engine, rows, cols), op, items, 1))
+            op, items = run_overflow(engine, boards, deltas=True)
+            benchmarks.append(("overflow/{}-deltas/{}x{}".format(engine, rows, cols), op, items, 1))
+
+    # A chain through a whole grid makes every wave large. It has its own
+    # generator so the workloads below stay those of older baselines.
+    chain_rng = random.Random(seed)
+    for rows, cols in [(20, 20)] if quick else [(20, 20), (60, 60), (100, 100)]:
+        boards = chain_workload(chain_rng, rows, cols, 3 if rows * cols <= 3600 else 2)
+        for engine in sorted(OVERFLOW_ENGINES):
+            if engine == "numpy" and np is None:
+                continue
+            if engine == "recursive" and rows * cols > 400:
+                continue
+            op, items = run_overflow(engine, boards)
+            benchmarks.append(("overflow-chain/{}/{}x{}".format(engine, rows, cols), op, items, 1))
+
+    positions = position_workload(rng, 5, 6, 10 if quick else 40, 8)
+    for kind in ("list", "flat", "state"):
+        op, items = run_make_move(kind, positions)
+        moves = sum(len(possible_moves(board, player)) for board, player in positions)
+        benchmarks.append(("make_move/{}/5x6".format(kind), op, items, moves / len(items)))
+
+    searches = [("alphabeta", 2), ("alphabeta", 3), ("minimax", 2)]
+    if not quick:
+        searches += [("alphabeta", 4), ("minimax", 3)]
+    for search, depth in searches:
+        op, items = run_search(search, depth, positions[:5] if quick else positions[:20])
+        benchmarks.append(("search/{}/depth{}".format(search, depth), op, items, 1))
+    for depth in ([4] if quick else [4, 6]):
+        op, items = run_search("alphabeta", depth, positions[:5] if quick else positions[:20], reduce_moves=True)
+        benchmarks.append(("search/alphabeta-reduced/depth{}".format(depth), op, items, 1))
+    iterations = 100 if quick else 500
+    op, items = run_mcts(iterations, positions[:5] if quick else positions[:20], seed)
+    benchmarks.append(("search/mcts/{}playouts".format(iterations), op, items, 1))
+    if np is not None:
+        games = 1000 if quick else 10000
+        op, items = run_batch_playouts(games, seed)
+        benchmarks.append(("playout/batch/{}".format(games), op, items, games))
+
+    for count in ([1000] if quick else [1000, 20000]):
+        keys = ["key{}".format(rng.getrandbits(48)) for _ in range(count)]
+        op, items = run_hash_table(keys)
+        benchmarks.append(("hash_table/{}".format(count), op, items, 3 * count))
+        op, items = run_hash_table(keys, RobinHoodHashTable)
+        benchmarks.append(("hash_table/robin_hood/{}".format(count), op, items, 3 * count))
+        op, items = run_hash_table(keys, BoundedHashTable)
+        benchmarks.append(("hash_table/bounded/{}".format(count), op, items, 3 * count))
+    return benchmarks
+
+
+def percentile(values, p):
+    # nearest-rank percentile of a non-empty list
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(op, items, ops_per_item=1, repeat=3):
+    """
+    Time a benchmark.
+
+    Parameters:
+    op (function): The operation, called once per item.
+    items (list): The workload.
+    ops_per_item (float): Operations one call of op makes, for ops/sec.
+    repeat (int): Passes over the workload; the fastest pass counts.
+
+    Returns:
+    dict: ops_per_sec, nodes_per_sec (searches only), latency percentiles
+          of single calls in seconds and peak_memory in bytes.
+    """
+    best = None
+    latencies = []
+    nodes = 0
+    for _ in range(repeat):
+        nodes = 0
+        start = time.perf_counter()
+        for item in items:
+            begin = time.perf_counter()
+            result = op(item)
+            latencies.append(time.perf_counter() - begin)
+            if isinstance(result, int):
+                nodes += result
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    # memory is measured on a separate pass, tracemalloc slows everything down
+    tracemalloc.start()
+    for item in items:
+        op(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {
+        "ops_per_sec": len(items) * ops_per_item / best if best > 0 else 0.0,
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies),
+        },
+        "peak_memory": peak,
+    }
+    if nodes:
+        result["nodes_per_sec"] = nodes / best if best > 0 else 0.0
+    return result
+
+
+def run_benchmarks(quick=False, seed=0, repeat=3, select=None):
+    """
+    Run the benchmarks.
+
+    Parameters:
+    quick (bool): Use the quick workloads.
+    seed (int): Seed for the workloads.
+    repeat (int): Passes over each workload.
+    select (str): Only run benchmarks whose name contains this.
+
+    Returns:
+    dict: Benchmark name -> result of measure().
+    """
+    results = {}
+    for name, op, items, ops_per_item in build_benchmarks(quick, seed):
+        if select and select not in name:
+            continue
+        results[name] = measure(op, items, ops_per_item, repeat)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline.
+
+    Parameters:
+    results (dict): Results of run_benchmarks.
+    baseline (dict): Earlier results, as saved by save_baseline.
+    threshold (float): Fraction of ops/sec that may be lost before a
+                       benchmark counts as a regression.
+
+    Returns:
+    list of tuple: (name, baseline ops/sec, new ops/sec, ratio, regressed)
+                   for every benchmark present in both.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["ops_per_sec"]
+        new = result["ops_per_sec"]
+        ratio = new / old if old > 0 else float('inf')
+        rows.append((name, old, new, ratio, ratio < 1 - threshold))
+    return rows
+
+
+def save_baseline(results, path, seed=0, quick=False):
+    # results go under "benchmarks"; the rest says how they were made
+    data = {"seed": seed, "quick": quick, "python": sys.version.split()[0], "benchmarks": results}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["benchmarks"]
+
+
+def format_results(results):
+    lines = ["{:<32} {:>14} {:>14} {:>10} {:>10} {:>10}".format(
+        "benchmark", "ops/sec", "nodes/sec", "p50 ms", "p99 ms", "peak KiB")]
+    for name, result in results.items():
+        nodes = result.get("nodes_per_sec")
+        lines.append("{:<32} {:>14.1f} {:>14} {:>10.3f} {:>10.3f} {:>10.1f}".format(
+            name, result["ops_per_sec"], "{:.1f}".format(nodes) if nodes else "-",
+            result["latency"]["p50"] * 1000, result["latency"]["p99"] * 1000,
+            result["peak_memory"] / 1024))
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    lines = ["{:<32} {:>14} {:>14} {:>8}".format("benchmark", "baseline", "now", "change")]
+    for name, old, new, ratio, regressed in rows:
+        lines.append("{:<32} {:>14.1f} {:>14.1f} {:>+7.1%}{}".format(
+            name, old, new, ratio - 1, "  SLOWER" if regressed else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rules engines, search and hash table.")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each workload")
+    parser.add_argument("--select", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="ops/sec fraction that may be lost before it is a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick, args.seed, args.repeat, args.select)
+    print(format_results(results))
+    if args.save:
+        save_baseline(results, args.save, args.seed, args.quick)
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        print()
+        print(format_comparison(rows))
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
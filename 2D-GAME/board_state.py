@@ -0,0 +1,155 @@
+# Board with running piece counts.
+#
+# A BoardState wraps a list of lists board and keeps, for every write to
+# it, how many cells hold each value and how many cells and pieces each
+# player owns. Scoring a board and checking for a winner then only reads
+# those counts instead of scanning the grid.
+
+from a2_partb import copy_board, make_move, possible_moves, extract_move
+
+
+class BoardState:
+    def __init__(self, board):
+        """
+        Wrap a board and count its pieces.
+
+        Parameters:
+        board (list of list of int): The board. It is used directly, not
+                                     copied, and should only be written
+                                     through set() from now on.
+        """
+        self.board = board
+        self.size = len(board) * len(board[0])
+        # value -> number of cells holding it
+        self.counts = {}
+        # player -> number of cells the player owns
+        self.owned = {1: 0, -1: 0}
+        # player -> number of pieces the player has on the board
+        self.material = {1: 0, -1: 0}
+        for row in board:
+            for cell in row:
+                self.count(cell, 1)
+
+    def count(self, value, step):
+        """
+        Add (step 1) or remove (step -1) a cell holding value from the counts.
+
+        Parameters:
+        value (int): The value of the cell.
+        step (int): 1 to add the cell, -1 to remove it.
+        """
+        self.counts[value] = self.counts.get(value, 0) + step
+        if value > 0:
+            self.owned[1] += step
+            self.material[1] += value * step
+        elif value < 0:
+            self.owned[-1] += step
+            self.material[-1] -= value * step
+
+    def set(self, row, col, value):
+        """
+        Write a cell and update the counts.
+
+        Parameters:
+        row (int): The row of the cell.
+        col (int): The column of the cell.
+        value (int): The new value of the cell.
+        """
+        old = self.board[row][col]
+        if old != value:
+            self.count(old, -1)
+            self.count(value, 1)
+            self.board[row][col] = value
+
+    def apply(self, trail):
+        """
+        Update the counts for writes that were already made to the board.
+
+        Parameters:
+        trail (list of tuple): (row, col, old value, new value) per write.
+        """
+        for row, col, old, new in trail:
+            self.count(old, -1)
+            self.count(new, 1)
+
+    def winner(self):
+        """
+        Check the board for a winner the same way game.Board.check_win does.
+
+        Returns:
+        int: -1 if player 1 has no cells left, 1 if player 2 has none left,
+             0 otherwise.
+        """
+        if self.owned[1] == 0:
+            return -1
+        if self.owned[-1] == 0:
+            return 1
+        return 0
+
+    def evaluate(self, player):
+        """
+        Score the board the same way as a2_partb.evaluate_board, in O(1).
+
+        Parameters:
+        player (int): The player the score is for (1 or -1).
+
+        Returns:
+        float: Cells holding exactly player minus cells holding exactly
+               -player, or +/-inf for a won or lost board.
+        """
+        mine = self.counts.get(player, 0)
+        theirs = self.counts.get(-player, 0)
+        empty = self.counts.get(0, 0)
+        if mine + empty == self.size:
+            return float('inf')
+        if theirs + empty == self.size:
+            return float('-inf')
+        return mine - theirs
+
+    def copy(self):
+        """
+        Copy the board and its counts without recounting.
+
+        Returns:
+        BoardState: An independent copy.
+        """
+        state = BoardState.__new__(BoardState)
+        state.board = copy_board(self.board)
+        state.size = self.size
+        state.counts = dict(self.counts)
+        state.owned = dict(self.owned)
+        state.material = dict(self.material)
+        return state
+
+    def make_move(self, move, player, trail=None):
+        """
+        Make a move with the a2_partb rules on a copy of the state.
+
+        Parameters:
+        move (tuple): The row and column of the move.
+        player (int): The player making the move (1 or -1).
+        trail (list): If given, the writes of the move are appended to it.
+
+        Returns:
+        BoardState: The state after the move.
+        """
+        writes = []
+        state = BoardState.__new__(BoardState)
+        state.board = make_move(self.board, move, player, writes)
+        state.size = self.size
+        state.counts = dict(self.counts)
+        state.owned = dict(self.owned)
+        state.material = dict(self.material)
+        state.apply(writes)
+        if trail is not None:
+            trail.extend(writes)
+        return state
+
+    def possible_moves(self, player):
+        return possible_moves(self.board, player)
+
+    def extract_move(self, new_state):
+        return extract_move(self.board, new_state.board)
+
+    def to_list(self):
+        return copy_board(self.board)
@@ -0,0 +1,252 @@
+# Compact board representation for Chain Reaction.
+#
+# A FlatBoard keeps the cells of a board in one array('b') in row major
+# order.  Everything that only depends on the shape of the board (the
+# coordinates of a cell index and the in-bounds neighbours of a cell) is
+# computed once per shape and shared by every board of that shape, so the
+# hot functions never redo bounds checks.
+
+from array import array
+
+# (rows, cols) -> ShapeTables
+_SHAPE_TABLES = {}
+
+
+class ShapeTables:
+    """Lookup tables shared by all boards with the same number of rows and columns."""
+
+    def __init__(self, rows, cols):
+        """
+        Build the tables for a shape.
+
+        Parameters:
+        rows (int): The number of rows.
+        cols (int): The number of columns.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        # coords[index] is the (row, col) of a cell index
+        self.coords = tuple((i, j) for i in range(rows) for j in range(cols))
+        # neighbors[index] holds the in-bounds neighbours in up, down, left,
+        # right order, the order a2_partb.overflow visits them in
+        neighbors = []
+        for i, j in self.coords:
+            cell_neighbors = []
+            for x, y in [(i-1, j), (i+1, j), (i, j-1), (i, j+1)]:
+                if 0 <= x < rows and 0 <= y < cols:
+                    cell_neighbors.append(x * cols + y)
+            neighbors.append(tuple(cell_neighbors))
+        self.neighbors = tuple(neighbors)
+
+
+def shape_tables(rows, cols):
+    """
+    Get the cached lookup tables for a shape.
+
+    Parameters:
+    rows (int): The number of rows.
+    cols (int): The number of columns.
+
+    Returns:
+    ShapeTables: The tables for boards of that shape.
+    """
+    tables = _SHAPE_TABLES.get((rows, cols))
+    if tables is None:
+        tables = ShapeTables(rows, cols)
+        _SHAPE_TABLES[(rows, cols)] = tables
+    return tables
+
+
+class FlatBoard:
+    __slots__ = ("rows", "cols", "cells", "tables")
+
+    def __init__(self, rows, cols, cells=None):
+        """
+        Initialize a board.
+
+        Parameters:
+        rows (int): The number of rows.
+        cols (int): The number of columns.
+        cells (iterable of int): The cells in row major order, all empty
+                                 when None.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.tables = shape_tables(rows, cols)
+        if cells is None:
+            self.cells = array('b', bytes(rows * cols))
+        else:
+            self.cells = array('b', cells)
+            if len(self.cells) != rows * cols:
+                raise ValueError("expected {} cells, got {}".format(rows * cols, len(self.cells)))
+
+    @classmethod
+    def from_list(cls, board):
+        """
+        Build a FlatBoard from a list of lists.
+
+        Parameters:
+        board (list of list of int): The board as a 2D list.
+
+        Returns:
+        FlatBoard: The same board in flat form.
+        """
+        return cls(len(board), len(board[0]), [cell for row in board for cell in row])
+
+    def to_list(self):
+        """
+        Convert the board back to a list of lists.
+
+        Returns:
+        list of list of int: The board as a 2D list.
+        """
+        cols = self.cols
+        return [self.cells[i:i + cols].tolist() for i in range(0, self.rows * cols, cols)]
+
+    def copy(self):
+        """
+        Copy the board with a single buffer copy.
+
+        Returns:
+        FlatBoard: An independent copy of the board.
+        """
+        new_board = FlatBoard.__new__(FlatBoard)
+        new_board.rows = self.rows
+        new_board.cols = self.cols
+        new_board.tables = self.tables
+        new_board.cells = self.cells[:]
+        return new_board
+
+    def get(self, row, col):
+        """
+        Get the value of a cell.
+
+        Parameters:
+        row (int): The row of the cell.
+        col (int): The column of the cell.
+
+        Returns:
+        int: The number of pieces in the cell, negative for player -1.
+        """
+        return self.cells[row * self.cols + col]
+
+    def set(self, row, col, value):
+        """
+        Set the value of a cell.
+
+        Parameters:
+        row (int): The row of the cell.
+        col (int): The column of the cell.
+        value (int): The new value of the cell.
+        """
+        self.cells[row * self.cols + col] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, FlatBoard):
+            return NotImplemented
+        return self.rows == other.rows and self.cols == other.cols and self.cells == other.cells
+
+    def __repr__(self):
+        return "FlatBoard({})".format(self.to_list())
+
+    def possible_moves(self, player):
+        """
+        Get the cells the player may place a piece in.
+
+        Parameters:
+        player (int): The player to move (1 or -1).
+
+        Returns:
+        list of tuple: (row, col) of the empty and own cells, row major.
+        """
+        coords = self.tables.coords
+        return [coords[index] for index, cell in enumerate(self.cells) if cell == 0 or cell == player]
+
+    def evaluate(self, player):
+        """
+        Score the board the same way as a2_partb.evaluate_board.
+
+        Parameters:
+        player (int): The player the score is for (1 or -1).
+
+        Returns:
+        float: Cells holding exactly player minus cells holding exactly
+               -player, inf when every piece is a single player piece and
+               -inf when every piece is a single opponent piece.
+        """
+        cells = self.cells
+        mine = cells.count(player)
+        theirs = cells.count(-player)
+        empty = cells.count(0)
+        if mine + empty == len(cells):
+            return float('inf')
+        if theirs + empty == len(cells):
+            return float('-inf')
+        return mine - theirs
+
+    def make_move(self, move, player, trail=None):
+        """
+        Make a move on a copy of the board with the a2_partb overflow rules.
+
+        Parameters:
+        move (tuple): The row and column of the move.
+        player (int): The player making the move (1 or -1).
+        trail (list): If given, (row, col, old value, new value) is appended
+                      for every cell write, in order.
+
+        Returns:
+        FlatBoard: The board after the move.
+        """
+        new_board = self.copy()
+        index = move[0] * self.cols + move[1]
+        cells = new_board.cells
+        if trail is not None:
+            trail.append(move + (cells[index], cells[index] + player))
+        cells[index] += player
+        new_board.overflow(index, player, trail)
+        return new_board
+
+    def overflow(self, index, player, trail=None):
+        """
+        Overflow a cell in place, like a2_partb.overflow.
+
+        Parameters:
+        index (int): The flat index of the cell.
+        player (int): The player whose piece is overflowing (1 or -1).
+        trail (list): If given, every cell write is recorded as
+                      (row, col, old value, new value).
+        """
+        cells = self.cells
+        neighbors = self.tables.neighbors[index]
+        overflow_count = 0
+        for n in neighbors:
+            if cells[n] == player:
+                overflow_count += 1
+
+        if abs(cells[index]) >= overflow_count:
+            coords = self.tables.coords
+            if trail is not None:
+                trail.append(coords[index] + (cells[index], 0))
+            cells[index] = 0
+            for n in neighbors:
+                if trail is not None:
+                    trail.append(coords[n] + (cells[n], cells[n] + player))
+                cells[n] += player
+                if abs(cells[n]) >= 4:
+                    self.overflow(n, player, trail)
+
+    def extract_move(self, new_board):
+        """
+        Find the first cell that differs from another board of the same shape.
+
+        Parameters:
+        new_board (FlatBoard): The board after a move.
+
+        Returns:
+        tuple: (row, col) of the first differing cell, None if they are equal.
+        """
+        for index, (old, new) in enumerate(zip(self.cells, new_board.cells)):
+            if old != new:
+                return self.tables.coords[index]
+        return None
@@ -8,31 +8,19 @@
 #   https://opengameart.org/content/rotating-crystal-animation-8-step,
 #   https://creativecommons.org/licenses/by/3.0/
 
+#   The rules live in game_state.py; this file only draws a GameState and
+#   feeds it the clicks and bot moves.
+
 import pygame
 import sys
 import math
+import time
 
-from a1_partd import overflow
-from a1_partc import Queue
+import game_state
+from game_state import GameState, BotWorker, GRID_SIZE
 from player1 import PlayerOne
 from player2 import PlayerTwo
 
-# Function to create a deep copy of the board
-def copy_board(board):
-    """
-    Create a deep copy of the game board.
-
-    Parameters:
-    board (list of list of int): The game board to copy.
-
-    Returns:
-    list of list of int: A deep copy of the board.
-    """
-    current_board = []
-    for row in board:
-        current_board.append(row.copy())
-    return current_board
-
 # Button class to manage UI buttons
 class Button:
     def __init__(self, x, y, width, height, text):
@@ -132,7 +120,7 @@ class Dropdown:
         """
         return self.current_option
 
-class Board:
+class Board(game_state.Board):
     def __init__(self, width, height, p1_sprites, p2_sprites):
         """
         Initialize the game board.
@@ -143,123 +131,9 @@ class Board:
         p1_sprites (list of pygame.Surface): The list of sprites for player 1.
         p2_sprites (list of pygame.Surface): The list of sprites for player 2.
         """
-        self.width = width
-        self.height = height
-        self.board = [[0 for _ in range(width)] for _ in range(height)]
+        super().__init__(width, height)
         self.p1_sprites = p1_sprites
         self.p2_sprites = p2_sprites
-        self.board[0][0] = 1
-        self.board[self.height - 1][self.width - 1] = -1
-        self.turn = 0
-        self.history = []  # Stack to keep track of game states
-
-    def get_board(self):
-        """
-        Get the current state of the game board.
-
-        Returns:
-        list of list of int: The current state of the board.
-        """
-        current_board = []
-        for i in range(self.height):
-            current_board.append(self.board[i].copy())
-        return current_board
-
-    def valid_move(self, row, col, player):
-        """
-        Check if a move is valid.
-
-        Parameters:
-        row (int): The row of the move.
-        col (int): The column of the move.
-        player (int): The player making the move (1 or -1).
-
-        Returns:
-        bool: True if the move is valid, False otherwise.
-        """
-        if 0 <= row < self.height and 0 <= col < self.width:
-            if self.board[row][col] == 0 or self.board[row][col] / abs(self.board[row][col]) == player:
-                return True
-        return False
-
-    def add_piece(self, row, col, player):
-        """
-        Add a piece to the board at the specified location.
-
-        Parameters:
-        row (int): The row where the piece is added.
-        col (int): The column where the piece is added.
-        player (int): The player making the move (1 or -1).
-
-        Returns:
-        bool: True if the piece was successfully added, False otherwise.
-        """
-        self.history.append(copy_board(self.board))  # Save the current state before making a move
-        if self.valid_move(row, col, player):
-            self.board[row][col] += player
-            self.turn += 1
-            return True
-        return False
-
-    def undo(self):
-        """
-        Undo the last move made on the board.
-        """
-        if self.history:
-            self.board = self.history.pop()
-
-    def check_win(self):
-        """
-        Check if there is a winner.
-
-        Returns:
-        int: 1 if player 1 wins, -1 if player 2 wins, 0 if no winner yet.
-        """
-        if self.turn > 0:
-            num_p1 = 0
-            num_p2 = 0
-            for i in range(self.height):
-                for j in range(self.width):
-                    if self.board[i][j] > 0:
-                        if num_p2 > 0:
-                            return 0
-                        num_p1 += 1
-                    elif self.board[i][j] < 0:
-                        if num_p1 > 0:
-                            return 0
-                        num_p2 += 1
-            if num_p1 == 0:
-                return -1
-            if num_p2 == 0:
-                return 1
-        return 0
-
-    def do_overflow(self, q):
-        """
-        Handle overflow on the board.
-
-        Parameters:
-        q (Queue): The queue used to manage overflow states.
-
-        Returns:
-        int: The number of overflow steps taken.
-        """
-        oldboard = copy_board(self.board)
-        numsteps = overflow(self.board, q)
-        if numsteps != 0:
-            self.set(oldboard)
-        return numsteps
-
-    def set(self, newboard):
-        """
-        Set the board to a new state.
-
-        Parameters:
-        newboard (list of list of int): The new state of the board.
-        """
-        for row in range(self.height):
-            for col in range(self.width):
-                self.board[row][col] = newboard[row][col]
 
     def draw(self, window, frame):
         """
@@ -278,7 +152,7 @@ class Board:
                 if self.board[row][col] != 0:
                     rpos = row * CELL_SIZE + Y_OFFSET
                     cpos = col * CELL_SIZE + X_OFFSET
-                    sprite = p1_sprites if self.board[row][col] > 0 else p2_sprites
+                    sprite = self.p1_sprites if self.board[row][col] > 0 else self.p2_sprites
                     if abs(self.board[row][col]) == 1:
                         cpos += CELL_SIZE // 2 - 16
                         rpos += CELL_SIZE // 2 - 16
@@ -309,160 +183,293 @@ class Board:
                         rpos -= CELL_SIZE // 2
                         window.blit(sprite[math.floor(frame)], (cpos, rpos))
 
+class BoardRenderer:
+    def __init__(self, p1_sprites, p2_sprites):
+        """
+        Initialize a renderer that only redraws the cells that changed.
+
+        Every cell is drawn as one pre-composed tile, its border and gems
+        together, cached by (owner, count, animation frame). Each frame only
+        the cells whose tile differs from the one already on the window are
+        blitted, in one Surface.blits call, and their rectangles returned
+        for pygame.display.update.
+
+        Parameters:
+        p1_sprites (list of pygame.Surface): The list of sprites for player 1.
+        p2_sprites (list of pygame.Surface): The list of sprites for player 2.
+        """
+        self.sprites = {1: p1_sprites, -1: p2_sprites}
+        self.tiles = {}  # (owner, count, frame) -> tile Surface
+        self.drawn = {}  # (row, col) -> key of the tile on the window
+
+    def invalidate(self):
+        """
+        Forget what is on the window, so the next draw redraws every cell.
+        """
+        self.drawn = {}
+
+    def gem_offsets(self, count):
+        """
+        Get where the gems of a cell go, the same places Board.draw uses.
+
+        Parameters:
+        count (int): The number of gems in the cell.
+
+        Returns:
+        list of tuple: (x, y) of each gem inside the cell.
+        """
+        half = CELL_SIZE // 2
+        return {
+            1: [(half - 16, half - 16)],
+            2: [(half - 32, half - 16), (half, half - 16)],
+            3: [(half - 16, 8), (half - 32, 8 + half), (half, 8 + half)],
+            4: [(half - 32, 8), (half - 32, 8 + half), (half, 8 + half), (half, 8)],
+        }.get(count, [])
+
+    def tile(self, key):
+        """
+        Get the tile for a cell, composing it on first use.
+
+        Parameters:
+        key (tuple): (owner, count, frame) of the cell.
+
+        Returns:
+        pygame.Surface: The tile.
+        """
+        tile = self.tiles.get(key)
+        if tile is None:
+            owner, count, frame = key
+            tile = pygame.Surface((CELL_SIZE, CELL_SIZE))
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert()
+            tile.fill(WHITE)
+            pygame.draw.rect(tile, BLACK, tile.get_rect(), 1)
+            for offset in self.gem_offsets(count):
+                tile.blit(self.sprites[owner][frame], offset)
+            self.tiles[key] = tile
+        return tile
+
+    def draw(self, window, board, frame):
+        """
+        Draw the cells that changed since the last draw.
+
+        Parameters:
+        window (pygame.Surface): The window to draw the board on.
+        board (list of list of int): The board to draw.
+        frame (float): The current frame of the animation.
+
+        Returns:
+        list of pygame.Rect: The parts of the window that were drawn.
+        """
+        frame = math.floor(frame)
+        blits = []
+        for row in range(len(board)):
+            for col in range(len(board[0])):
+                value = board[row][col]
+                count = abs(value)
+                if value == 0 or count > 4:
+                    # nothing animates in these cells
+                    key = (1 if value >= 0 else -1, count, 0)
+                else:
+                    key = (1 if value > 0 else -1, count, frame)
+                if self.drawn.get((row, col)) != key:
+                    self.drawn[(row, col)] = key
+                    blits.append((self.tile(key), (col * CELL_SIZE + X_OFFSET, row * CELL_SIZE + Y_OFFSET)))
+        if not blits:
+            return []
+        return window.blits(blits)
+
 
 # Constants
-GRID_SIZE = (5, 6)
 CELL_SIZE = 100
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 X_OFFSET = 0
 Y_OFFSET = 100
 FULL_DELAY = 5
+# Parts of the window redrawn every frame when only dirty rectangles are updated
+PANEL_RECT = pygame.Rect(800, 0, 400, 800)
+STATUS_RECT = pygame.Rect(0, 700, 800, 100)
 
-# Load sprites for players
-p1spritesheet = pygame.image.load('blue.png')
-p2spritesheet = pygame.image.load('pink.png')
-p1_sprites = []
-p2_sprites = []
-
-# Player IDs
-player_id = [1, -1]
-
-# Extract sprites from the spritesheet
-for i in range(8):
-    curr_sprite = pygame.Rect(32 * i, 0, 32, 32)
-    p1_sprites.append(p1spritesheet.subsurface(curr_sprite))
-    p2_sprites.append(p2spritesheet.subsurface(curr_sprite))
-
-frame = 0
-
-# Initialize Pygame
-pygame.init()
-window = pygame.display.set_mode((1200, 800))
-
-pygame.font.init()
-font = pygame.font.Font(None, 36)
-bigfont = pygame.font.Font(None, 108)
-
-# Create the game board and UI elements
-player1_dropdown = Dropdown(900, 50, 200, 50, ['Human', 'AI'])
-player2_dropdown = Dropdown(900, 110, 200, 50, ['Human', 'AI'])
-undo_button = Button(900, 250, 200, 50, 'Undo Last Move')
-restart_button = Button(900, 310, 200, 50, 'Restart Game')
-
-status = ["", ""]
-current_player = 0
-board = Board(GRID_SIZE[1], GRID_SIZE[0], p1_sprites, p2_sprites)
-
-running = True
-overflow_boards = Queue()
-overflowing = False
-numsteps = 0
-has_winner = False
-bots = [PlayerOne(), PlayerTwo()]
-grid_col = -1
-grid_row = -1
-choice = [None, None]
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        else:
-            # Handle dropdowns to switch between Human and AI
-            player1_dropdown.handle_event(event)
-            player2_dropdown.handle_event(event)
-
-            # Handle undo and restart buttons
-            if undo_button.is_clicked(event):
-                if choice[current_player] == 0:  # Only allow human players to undo
-                    board.undo()
-                    current_player = (current_player + 1) % 2  # Revert to the previous player
-
-            if restart_button.is_clicked(event):
-                board = Board(GRID_SIZE[1], GRID_SIZE[0], p1_sprites, p2_sprites)  # Reset the board
-                current_player = 0  # Reset to player 1's turn
-                has_winner = False  # Reset the winner status
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = event.pos
-                row = y - Y_OFFSET
-                col = x - X_OFFSET
-                grid_row, grid_col = row // CELL_SIZE, col // CELL_SIZE
-
-    # Update choices after handling events
-    choice[0] = player1_dropdown.get_choice()
-    choice[1] = player2_dropdown.get_choice()
-
-    # Check for a winner
-    win = board.check_win()
-    if win != 0:
-        winner = 1 if win == 1 else 2
-        has_winner = True
-
-    if not has_winner:
-        if overflowing:
-            status[0] = "Overflowing"
-            if not overflow_boards.is_empty():
-                if repeat_step == FULL_DELAY:
-                    next_board = overflow_boards.dequeue()
-                    board.set(next_board)
+def main(dirty_rects=True):
+    """
+    Run the game.
+
+    Parameters:
+    dirty_rects (bool): Redraw only the cells that changed and update only
+                        those parts of the window. With False every frame
+                        repaints the whole window, for comparison with the
+                        frame time shown in the corner.
+    """
+    # Load sprites for players
+    p1spritesheet = pygame.image.load('blue.png')
+    p2spritesheet = pygame.image.load('pink.png')
+    p1_sprites = []
+    p2_sprites = []
+
+    # Extract sprites from the spritesheet
+    for i in range(8):
+        curr_sprite = pygame.Rect(32 * i, 0, 32, 32)
+        p1_sprites.append(p1spritesheet.subsurface(curr_sprite))
+        p2_sprites.append(p2spritesheet.subsurface(curr_sprite))
+
+    frame = 0
+
+    # Initialize Pygame
+    pygame.init()
+    window = pygame.display.set_mode((1200, 800))
+
+    pygame.font.init()
+    font = pygame.font.Font(None, 36)
+    bigfont = pygame.font.Font(None, 108)
+
+    # Create the game board and UI elements
+    player1_dropdown = Dropdown(900, 50, 200, 50, ['Human', 'AI'])
+    player2_dropdown = Dropdown(900, 110, 200, 50, ['Human', 'AI'])
+    undo_button = Button(900, 250, 200, 50, 'Undo Last Move')
+    restart_button = Button(900, 310, 200, 50, 'Restart Game')
+    redo_button = Button(900, 370, 200, 50, 'Redo Move')
+
+    status = ["", ""]
+    game = GameState(board=Board(GRID_SIZE[1], GRID_SIZE[0], p1_sprites, p2_sprites))
+
+    renderer = BoardRenderer(p1_sprites, p2_sprites)
+    redraw_all = True
+    frame_ms = 0.0  # average time spent drawing a frame
+
+    running = True
+    repeat_step = 0
+    bots = [PlayerOne(), PlayerTwo()]
+    worker = BotWorker()  # bots search here so the window never freezes
+    grid_col = -1
+    grid_row = -1
+    choice = [None, None]
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            else:
+                # Handle dropdowns to switch between Human and AI
+                player1_dropdown.handle_event(event)
+                player2_dropdown.handle_event(event)
+
+                # Handle undo and restart buttons
+                if undo_button.is_clicked(event):
+                    if choice[game.current_player] == 0:  # Only allow human players to undo
+                        worker.cancel()
+                        game.undo()  # Also reverts to the previous player
+
+                if redo_button.is_clicked(event):
+                    if choice[game.current_player] == 0:
+                        worker.cancel()
+                        game.redo()
+
+                if restart_button.is_clicked(event):
+                    # Reset the board, player 1's turn and the winner
+                    if game.winner != 0:
+                        redraw_all = True  # clear the winner text
+                    worker.cancel()
+                    game = GameState(board=Board(GRID_SIZE[1], GRID_SIZE[0], p1_sprites, p2_sprites))
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    x, y = event.pos
+                    row = y - Y_OFFSET
+                    col = x - X_OFFSET
+                    grid_row, grid_col = row // CELL_SIZE, col // CELL_SIZE
+
+        # Update choices after handling events
+        choice[0] = player1_dropdown.get_choice()
+        choice[1] = player2_dropdown.get_choice()
+
+        # Check for a winner
+        game.check_win()
+
+        if game.winner == 0:
+            if game.overflowing:
+                status[0] = "Overflowing"
+                if repeat_step == FULL_DELAY or game.overflow_boards.is_empty():
+                    game.step()
                     repeat_step = 0
                 else:
                     repeat_step += 1
+
             else:
-                overflowing = False
-                current_player = (current_player + 1) % 2
+                status[0] = "Player " + str(game.current_player + 1) + "'s turn"
+                make_move = False
+                if choice[game.current_player] == 1:
+                    if not worker.thinking() and worker.start(bots[game.current_player], game.board.get_board()):
+                        status[1] = "Bot is thinking"
+                    done, move = worker.poll()
+                    if done:
+                        (grid_row, grid_col) = move
+                        status[1] = "Bot chose row {}, col {}".format(grid_row, grid_col)
+                        if not game.valid_move(grid_row, grid_col):
+                            game.forfeit()
+                        else:
+                            make_move = True
+                else:
+                    if worker.thinking():
+                        worker.cancel()  # switched to a human while the bot searched
+                    if game.valid_move(grid_row, grid_col):
+                        make_move = True
 
+                if make_move:
+                    game.play(grid_row, grid_col)
+                    repeat_step = 0
+                    grid_row = -1
+                    grid_col = -1
+
+        # Drawing the game elements
+        draw_start = time.perf_counter()
+        if dirty_rects:
+            dirty = [PANEL_RECT, STATUS_RECT]
+            if redraw_all:
+                window.fill(WHITE)
+                renderer.invalidate()
+                dirty = [window.get_rect()]
+                redraw_all = False
+            dirty += renderer.draw(window, game.board.board, frame)
+            window.fill(WHITE, PANEL_RECT)
+            window.fill(WHITE, STATUS_RECT)
         else:
-            status[0] = "Player " + str(current_player + 1) + "'s turn"
-            make_move = False
-            if choice[current_player] == 1:
-                (grid_row, grid_col) = bots[current_player].get_play(board.get_board())
-                status[1] = "Bot chose row {}, col {}".format(grid_row, grid_col)
-                if not board.valid_move(grid_row, grid_col, player_id[current_player]):
-                    has_winner = True
-                    winner = ((current_player + 1) % 2) + 1
-                else:
-                    make_move = True
+            window.fill(WHITE)
+            game.board.draw(window, frame)
+        window.blit(p1_sprites[math.floor(frame)], (850, 60))
+        window.blit(p2_sprites[math.floor(frame)], (850, 120))
+        frame = (frame + 0.5) % 8
+
+        player1_dropdown.draw(window)
+        player2_dropdown.draw(window)
+        undo_button.draw(window)
+        restart_button.draw(window)
+        redo_button.draw(window)
+        text = font.render("Frame {:.2f} ms".format(frame_ms), True, BLACK)
+        window.blit(text, (900, 750))
+
+        if game.winner == 0:
+            text = font.render(status[0], True, BLACK)
+            window.blit(text, (X_OFFSET, 750))
+            text = font.render(status[1], True, BLACK)
+            window.blit(text, (X_OFFSET, 700))
+        else:
+            winner = 1 if game.winner == 1 else 2
+            text = bigfont.render("Player " + str(winner) + " wins!", True, BLACK)
+            if dirty_rects:
+                dirty.append(window.blit(text, (300, 250)))
             else:
-                if board.valid_move(grid_row, grid_col, player_id[current_player]):
-                    make_move = True
-
-            if make_move:
-                board.add_piece(grid_row, grid_col, player_id[current_player])
-                numsteps = board.do_overflow(overflow_boards)
-                if numsteps != 0:
-                    overflowing = True
-                    repeat_step = 0
-                else:
-                    current_player = (current_player + 1) % 2
-                grid_row = -1
-                grid_col = -1
-
-    # Drawing the game elements
-    window.fill(WHITE)
-    board.draw(window, frame)
-    window.blit(p1_sprites[math.floor(frame)], (850, 60))
-    window.blit(p2_sprites[math.floor(frame)], (850, 120))
-    frame = (frame + 0.5) % 8
-
-    player1_dropdown.draw(window)
-    player2_dropdown.draw(window)
-    undo_button.draw(window)
-    restart_button.draw(window)
-
-    if not has_winner:
-        text = font.render(status[0], True, BLACK)
-        window.blit(text, (X_OFFSET, 750))
-        text = font.render(status[1], True, BLACK)
-        window.blit(text, (X_OFFSET, 700))
-    else:
-        text = bigfont.render("Player " + str(winner) + " wins!", True, BLACK)
-        window.blit(text, (300, 250))
-
-    pygame.display.update()
-    pygame.time.delay(100)
-
-pygame.quit()
-sys.exit()
+                window.blit(text, (300, 250))
+
+        if dirty_rects:
+            pygame.display.update(dirty)
+        else:
+            pygame.display.update()
+        # Time to draw a frame, averaged over about the last 20 frames
+        frame_ms += ((time.perf_counter() - draw_start) * 1000 - frame_ms) / 20
+        pygame.time.delay(100)
+
+    pygame.quit()
+    sys.exit()
+
+if __name__ == '__main__':
+    main()
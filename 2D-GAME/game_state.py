@@ -0,0 +1,465 @@
+#   The rules of the game without the window.
+#   Board holds the grid, checks and makes moves, runs the overflow and
+#   finds the winner; GameState adds whose turn it is and steps through
+#   the overflow one wave at a time. game.py draws a GameState, and the
+#   arena and tests can play one without pygame.
+
+import threading
+from collections import deque
+
+from a1_partd import overflow
+from a1_partc import Queue
+from flat_board import FlatBoard
+from board_state import BoardState
+
+# Rows and columns of the game board
+GRID_SIZE = (5, 6)
+
+# Player IDs
+player_id = [1, -1]
+
+# Function to create a deep copy of the board
+def copy_board(board):
+    """
+    Create a deep copy of the game board.
+
+    Parameters:
+    board (list of list of int): The game board to copy.
+
+    Returns:
+    list of list of int: A deep copy of the board.
+    """
+    current_board = []
+    for row in board:
+        current_board.append(row.copy())
+    return current_board
+
+class Board:
+    def __init__(self, width, height, max_history=None):
+        """
+        Initialize the game board.
+
+        Parameters:
+        width (int): The width of the board.
+        height (int): The height of the board.
+        max_history (int): Number of moves that can be undone, unlimited
+                           when None. Older moves are forgotten.
+        """
+        self.width = width
+        self.height = height
+        self.board = [[0 for _ in range(width)] for _ in range(height)]
+        self.board[0][0] = 1
+        self.board[self.height - 1][self.width - 1] = -1
+        self.turn = 0
+        # Stack of change sets, one per move: (row, col) -> value before the
+        # move, for every cell the move or its overflow changed
+        self.history = deque(maxlen=max_history)
+        # Change sets of undone moves: (row, col) -> value after the move
+        self.redo_history = []
+        # Change set of the move whose overflow is still being set()
+        self.recording = None
+        # Piece counts kept up to date on every write, for check_win
+        self.state = BoardState(self.board)
+
+    def get_board(self):
+        """
+        Get the current state of the game board.
+
+        Returns:
+        list of list of int: The current state of the board.
+        """
+        current_board = []
+        for i in range(self.height):
+            current_board.append(self.board[i].copy())
+        return current_board
+
+    def get_flat_board(self):
+        """
+        Get a compact copy of the current state of the game board, for bots
+        built with flat=True.
+
+        Returns:
+        FlatBoard: The current state of the board.
+        """
+        return FlatBoard.from_list(self.board)
+
+    def valid_move(self, row, col, player):
+        """
+        Check if a move is valid.
+
+        Parameters:
+        row (int): The row of the move.
+        col (int): The column of the move.
+        player (int): The player making the move (1 or -1).
+
+        Returns:
+        bool: True if the move is valid, False otherwise.
+        """
+        if 0 <= row < self.height and 0 <= col < self.width:
+            if self.board[row][col] == 0 or self.board[row][col] / abs(self.board[row][col]) == player:
+                return True
+        return False
+
+    def add_piece(self, row, col, player):
+        """
+        Add a piece to the board at the specified location.
+
+        Parameters:
+        row (int): The row where the piece is added.
+        col (int): The column where the piece is added.
+        player (int): The player making the move (1 or -1).
+
+        Returns:
+        bool: True if the piece was successfully added, False otherwise.
+        """
+        if self.valid_move(row, col, player):
+            # Start the change set of this move; its overflow is added to it
+            self.recording = {}
+            self.history.append(self.recording)
+            self.redo_history.clear()
+            self.write(row, col, self.board[row][col] + player)
+            self.turn += 1
+            return True
+        return False
+
+    def write(self, row, col, value):
+        """
+        Write a cell, noting its old value in the change set of the move
+        being made.
+
+        Parameters:
+        row (int): The row of the cell.
+        col (int): The column of the cell.
+        value (int): The new value of the cell.
+        """
+        old = self.board[row][col]
+        if old != value:
+            if self.recording is not None and (row, col) not in self.recording:
+                self.recording[(row, col)] = old
+            self.state.set(row, col, value)
+
+    def undo(self):
+        """
+        Undo the last move made on the board, including its overflow.
+
+        Returns:
+        bool: True if a move was undone, False if there was none to undo.
+        """
+        if not self.history:
+            return False
+        changes = self.history.pop()
+        self.recording = None
+        self.redo_history.append({cell: self.board[cell[0]][cell[1]] for cell in changes})
+        for (row, col), value in changes.items():
+            self.state.set(row, col, value)
+        return True
+
+    def redo(self):
+        """
+        Make the last undone move again.
+
+        Returns:
+        bool: True if a move was redone, False if there was none to redo.
+        """
+        if not self.redo_history:
+            return False
+        changes = self.redo_history.pop()
+        self.recording = None
+        self.history.append({cell: self.board[cell[0]][cell[1]] for cell in changes})
+        for (row, col), value in changes.items():
+            self.state.set(row, col, value)
+        return True
+
+    def check_win(self):
+        """
+        Check if there is a winner.
+
+        Returns:
+        int: 1 if player 1 wins, -1 if player 2 wins, 0 if no winner yet.
+        """
+        if self.turn > 0:
+            return self.state.winner()
+        return 0
+
+    def do_overflow(self, q, deltas=False):
+        """
+        Handle overflow on the board.
+
+        Parameters:
+        q (Queue): The queue used to manage overflow states.
+        deltas (bool): Queue the changes of each wave, for apply_wave(),
+                       instead of a copy of the whole board, for set().
+
+        Returns:
+        int: The number of overflow steps taken.
+        """
+        # Run the waves on a copy; the board itself is updated one wave at a
+        # time through set() or apply_wave()
+        numsteps = overflow(copy_board(self.board), q, deltas=deltas)
+        return numsteps
+
+    def apply_wave(self, changes):
+        """
+        Apply the changes of one overflow wave.
+
+        Parameters:
+        changes (list of tuple): (row, col, new value) per changed cell.
+        """
+        for row, col, value in changes:
+            self.write(row, col, value)
+
+    def set(self, newboard):
+        """
+        Set the board to a new state.
+
+        Parameters:
+        newboard (list of list of int): The new state of the board, or a FlatBoard.
+        """
+        if isinstance(newboard, FlatBoard):
+            newboard = newboard.to_list()
+        for row in range(self.height):
+            for col in range(self.width):
+                self.write(row, col, newboard[row][col])
+
+class GameState:
+    def __init__(self, width=GRID_SIZE[1], height=GRID_SIZE[0], board=None):
+        """
+        Start a game.
+
+        Parameters:
+        width (int): The width of the board.
+        height (int): The height of the board.
+        board (Board): The board to play on, a new Board(width, height)
+                       when None.
+        """
+        self.board = board if board is not None else Board(width, height)
+        self.current_player = 0  # index into player_id
+        self.overflow_boards = Queue()  # changes of the overflow waves still to show
+        self.overflowing = False
+        self.winner = 0
+
+    def player(self):
+        """
+        Get the player whose turn it is.
+
+        Returns:
+        int: 1 or -1.
+        """
+        return player_id[self.current_player]
+
+    def next_turn(self):
+        """
+        Pass the turn to the other player.
+        """
+        self.current_player = (self.current_player + 1) % 2
+
+    def check_win(self):
+        """
+        Check the board for a winner and remember it.
+
+        Returns:
+        int: 1 if player 1 has won, -1 if player 2 has won, 0 otherwise.
+        """
+        if self.winner == 0:
+            self.winner = self.board.check_win()
+        return self.winner
+
+    def valid_move(self, row, col):
+        """
+        Check if the player whose turn it is may play a cell.
+
+        Returns:
+        bool: True if the move is valid, False otherwise.
+        """
+        return self.board.valid_move(row, col, self.player())
+
+    def play(self, row, col):
+        """
+        Play a cell for the player whose turn it is.
+
+        If the piece causes an overflow the waves are queued and the game is
+        overflowing until step() has shown them all; otherwise the turn
+        passes straight away.
+
+        Parameters:
+        row (int): The row of the move.
+        col (int): The column of the move.
+
+        Returns:
+        bool: True if the move was made, False if it was not valid.
+        """
+        if self.winner != 0 or self.overflowing or not self.valid_move(row, col):
+            return False
+        self.board.add_piece(row, col, self.player())
+        numsteps = self.board.do_overflow(self.overflow_boards, deltas=True)
+        if numsteps != 0:
+            self.overflowing = True
+        else:
+            self.next_turn()
+        return True
+
+    def forfeit(self):
+        """
+        End the game in favour of the player whose turn it is not, as when a
+        bot picks an invalid move.
+        """
+        self.winner = -self.player()
+
+    def step(self):
+        """
+        Show the next overflow wave. When there are none left the overflow
+        is over and the turn passes.
+
+        Returns:
+        bool: True if a wave was applied, False if the overflow is over.
+        """
+        if not self.overflowing:
+            return False
+        if not self.overflow_boards.is_empty():
+            self.board.apply_wave(self.overflow_boards.dequeue())
+            return True
+        self.overflowing = False
+        self.next_turn()
+        return False
+
+    def finish_overflow(self):
+        """
+        Apply all the remaining overflow waves at once.
+        """
+        while self.step():
+            pass
+
+    def undo(self):
+        """
+        Undo the last move and give the turn back. An overflow still being
+        shown is dropped along with the move that caused it.
+
+        Returns:
+        bool: True if a move was undone, False if there was none to undo.
+        """
+        if self.overflowing:
+            # Settle the board first, so the change set the move leaves for
+            # redo() is the whole move and not the waves shown so far
+            while not self.overflow_boards.is_empty():
+                self.board.apply_wave(self.overflow_boards.dequeue())
+            self.overflowing = False
+            if not self.board.undo():
+                # The move has been forgotten; it stays made and its turn ends
+                self.next_turn()
+                return False
+            # The player who made the move has not passed the turn yet
+            return True
+        if not self.board.undo():
+            return False
+        self.next_turn()
+        return True
+
+    def redo(self):
+        """
+        Make the last undone move again and pass the turn.
+
+        Returns:
+        bool: True if a move was redone, False if there was none to redo.
+        """
+        if self.overflowing or not self.board.redo():
+            return False
+        self.next_turn()
+        return True
+
+class BotWorker:
+    def __init__(self):
+        """
+        Compute bot moves on a background thread, so the window keeps
+        drawing and handling clicks while a bot searches.
+
+        start() hands a board to a bot, poll() picks up the move when it is
+        ready and cancel() throws away the move of a search that no longer
+        applies, e.g. after a restart. Bots whose get_play takes a stop
+        event are asked to give up when their search is cancelled; a new
+        search is only started once the cancelled one has returned, so a
+        bot never runs two searches at once.
+        """
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by cancel() so older searches are ignored
+        self.thread = None  # the thread of the last search started
+        self.stop = None  # set by cancel() to stop that search
+        self.asked = False  # a move has been asked for and not picked up
+        self.result = None
+
+    def start(self, bot, board):
+        """
+        Start computing a move, cancelling any search still running.
+
+        Parameters:
+        bot: The bot, anything with get_play(board) or
+             get_play(board, stop=None).
+        board (list of list of int): A copy of the board for the bot.
+
+        Returns:
+        bool: True if the search was started, False if a cancelled search
+              is still returning; try again later.
+        """
+        self.cancel()
+        if self.thread is not None and self.thread.is_alive():
+            return False
+        generation = self.generation
+        stop = threading.Event()
+        # Imported here; it would double the time importing the rules takes
+        import inspect
+        takes_stop = "stop" in inspect.signature(bot.get_play).parameters
+
+        def run():
+            try:
+                if takes_stop:
+                    result = (bot.get_play(board, stop=stop), None)
+                else:
+                    result = (bot.get_play(board), None)
+            except Exception as error:
+                result = (None, error)
+            with self.lock:
+                if generation == self.generation:
+                    self.result = result
+
+        self.stop = stop
+        self.asked = True
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        return True
+
+    def thinking(self):
+        """
+        Check if a move has been asked for and not picked up yet.
+
+        Returns:
+        bool: True while a search is running or its move is waiting.
+        """
+        return self.asked
+
+    def poll(self):
+        """
+        Pick up the move if the search has finished. An exception raised
+        by the bot is raised again here.
+
+        Returns:
+        tuple: (True, move) once the move is ready, (False, None) before.
+        """
+        with self.lock:
+            if self.result is None:
+                return False, None
+            move, error = self.result
+            self.result = None
+            self.asked = False
+        if error is not None:
+            raise error
+        return True, move
+
+    def cancel(self):
+        """
+        Forget the search that is running, if any, and ask it to stop.
+        """
+        with self.lock:
+            self.generation += 1
+            self.result = None
+            self.asked = False
+            if self.stop is not None:
+                self.stop.set()
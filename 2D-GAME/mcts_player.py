@@ -0,0 +1,201 @@
+import math
+import random
+import time
+
+from a2_partb import make_move, possible_moves
+
+# Exploration constant of UCT; sqrt(2) suits results between 0 and 1
+EXPLORATION = math.sqrt(2)
+
+# Moves after which a playout stops and the side with more pieces wins.
+# Under the a2_partb rules random games that get past the first few moves
+# seldom end at all, so longer playouts only cost time
+MAX_PLAYOUT_MOVES = 40
+
+def winner(board):
+    """
+    Check if one side has taken every piece on the board.
+
+    Parameters:
+    board (list of list of int): The board.
+
+    Returns:
+    int: 1 or -1 for the side left on the board, 0 while both have pieces.
+    """
+    mine = theirs = False
+    for row in board:
+        for cell in row:
+            if cell > 0:
+                mine = True
+            elif cell < 0:
+                theirs = True
+    if mine and not theirs:
+        return 1
+    if theirs and not mine:
+        return -1
+    return 0
+
+def count_winner(board):
+    # The side with more pieces, 0 when level; for playouts that do not finish
+    total = 0
+    for row in board:
+        for cell in row:
+            total += (cell > 0) - (cell < 0)
+    return (total > 0) - (total < 0)
+
+class MCTSPlayer:
+    """
+    Bot that picks its moves with Monte Carlo tree search.
+
+    Each iteration walks down the tree by UCT to a position with a move not
+    tried yet, plays it, finishes the game with random moves and counts the
+    result in every node on the way. The move played is the root move that
+    was tried most often. Moves follow the a2_partb rules the GameTree
+    bots search with, so the two engines can be compared like for like.
+    """
+
+    class Node:
+        __slots__ = ("board", "player", "move", "parent", "children", "untried",
+                     "visits", "wins", "result")
+
+        def __init__(self, board, player, move=None, parent=None):
+            """
+            Parameters:
+            board (list of list of int): The board at this node.
+            player (int): The player to move (1 or -1).
+            move (tuple): The move that led here from the parent.
+            parent (Node): The node above, None for the root.
+            """
+            self.board = board
+            self.player = player
+            self.move = move
+            self.parent = parent
+            self.children = []
+            self.visits = 0
+            self.wins = 0.0  # for the player who made move
+            self.result = winner(board) if parent is not None else 0
+            self.untried = possible_moves(board, player) if self.result == 0 else []
+            if self.result == 0 and not self.untried:
+                # The player to move is stuck; count pieces to end the game
+                self.result = count_winner(board)
+
+        def select(self, exploration):
+            """
+            Pick the child with the highest UCT value.
+
+            Returns:
+            Node: The child to descend into.
+            """
+            log_visits = math.log(self.visits)
+            best, best_value = None, -1.0
+            for child in self.children:
+                value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+                if value > best_value:
+                    best, best_value = child, value
+            return best
+
+    def __init__(self, player, name="MCTS Bot", iterations=None, time_limit=None,
+                 exploration=EXPLORATION, max_playout_moves=MAX_PLAYOUT_MOVES, seed=None):
+        """
+        Parameters:
+        player (int): The player the bot plays for (1 or -1).
+        name (str): The name of the bot.
+        iterations (int): Playouts per move; 1000 when there is no time
+                          limit either.
+        time_limit (float): Seconds each move may take.
+        exploration (float): UCT exploration constant.
+        max_playout_moves (int): Random moves after which a playout is
+                                 scored by piece count.
+        seed (int): Seed for the random playouts.
+        """
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        self.player = player
+        self.name = name
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.max_playout_moves = max_playout_moves
+        self.rng = random.Random(seed)
+        self.playouts = 0  # playouts of the last move
+        self.seconds = 0.0  # time the last move took
+        self.playouts_per_second = 0.0
+
+    def get_name(self):
+        return self.name
+
+    def playout(self, board, player):
+        """
+        Finish a game with random moves.
+
+        Parameters:
+        board (list of list of int): The board to start from.
+        player (int): The player to move.
+
+        Returns:
+        int: The winner, 1 or -1, or 0 for a level playout.
+        """
+        for _ in range(self.max_playout_moves):
+            moves = possible_moves(board, player)
+            if not moves:
+                break
+            board = make_move(board, self.rng.choice(moves), player)
+            result = winner(board)
+            if result != 0:
+                return result
+            player = -player
+        return count_winner(board)
+
+    def get_play(self, board, stop=None):
+        # stop: an Event that, once set, ends the search like the time limit
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        root = MCTSPlayer.Node([row[:] for row in board], self.player)
+        if not root.untried:
+            return None
+        playouts = 0
+        while self.iterations is None or playouts < self.iterations:
+            if playouts > 0 and ((deadline is not None and time.perf_counter() >= deadline)
+                                 or (stop is not None and stop.is_set())):
+                break
+            node = root
+            # Selection: follow UCT while every move of the node has been tried
+            while not node.untried and node.children:
+                node = node.select(self.exploration)
+            # Expansion: try one new move
+            if node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                child = MCTSPlayer.Node(make_move(node.board, move, node.player), -node.player, move, node)
+                node.children.append(child)
+                node = child
+            # Simulation
+            if node.result != 0 or not node.untried:
+                result = node.result
+            else:
+                result = self.playout(node.board, node.player)
+            # Backpropagation: each node is scored for the player who moved into it
+            while node is not None:
+                node.visits += 1
+                if result == -node.player:
+                    node.wins += 1.0
+                elif result == 0:
+                    node.wins += 0.5
+                node = node.parent
+            playouts += 1
+
+        self.playouts = playouts
+        self.seconds = time.perf_counter() - start
+        self.playouts_per_second = playouts / self.seconds if self.seconds > 0 else 0.0
+        return max(root.children, key=lambda child: child.visits).move
+
+class MCTSPlayerOne(MCTSPlayer):
+
+    def __init__(self, name = "P1 MCTS Bot", **budget):
+        # budget: iterations, time_limit and the tuning arguments of MCTSPlayer
+        super().__init__(1, name, **budget)
+
+class MCTSPlayerTwo(MCTSPlayer):
+
+    def __init__(self, name = "P2 MCTS Bot", **budget):
+        # budget: iterations, time_limit and the tuning arguments of MCTSPlayer
+        super().__init__(-1, name, **budget)
@@ -0,0 +1,231 @@
+# Opening book for the standard board.
+#
+# Every game starts from the same position, so the first few moves can be
+# searched once, deeply, instead of in every game. build_book() plays out the
+# opening: where the book's side is to move it searches the position and
+# follows the move found, where the other side is to move it follows every
+# reply. The moves are written to a file of fixed size records sorted by
+# position hash, which OpeningBook memory-maps and binary searches, so a
+# lookup reads a handful of records and the file is shared by every bot in
+# every process that opens it.
+#
+# To build the book, run: python opening_book.py [--plies 4] [--depth 6]
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from a2_parta import HashTable
+from a2_partb import GameTree
+from game_state import GRID_SIZE
+from search_player import play
+from zobrist import ZOBRIST
+
+# The book shipped next to this file, used by PlayerOne and PlayerTwo
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+# File layout: a header, then one record per position sorted by key
+MAGIC = b"CRBOOK01"
+HEADER = struct.Struct("<8sHHI")   # magic, rows, cols, number of records
+RECORD = struct.Struct("<QBB")     # position key, row, column of the move
+
+
+def position_key(board, player):
+    """
+    Get the book key of a position.
+
+    Parameters:
+    board (list of list of int): The board, or a FlatBoard.
+    player (int): The player to move (1 or -1).
+
+    Returns:
+    int: The Zobrist hash of the board with the side to move mixed in.
+    """
+    key = ZOBRIST.hash_board(board)
+    if player == -1:
+        key ^= ZOBRIST.side
+    return key
+
+
+class OpeningBook:
+    def __init__(self, path=BOOK_PATH):
+        """
+        Open a book file written by build_book.
+
+        Parameters:
+        path (str): The book file.
+        """
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError("{} is not an opening book".format(path))
+        magic, self.rows, self.cols, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError("{} is not an opening book".format(path))
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, board, player):
+        """
+        Look up the book move of a position.
+
+        Parameters:
+        board (list of list of int): The board, or a FlatBoard.
+        player (int): The player to move (1 or -1).
+
+        Returns:
+        tuple: The row and column of the book move, or None when the
+               position is not in the book.
+        """
+        if hasattr(board, "to_list"):
+            board = board.to_list()
+        if len(board) != self.rows or len(board[0]) != self.cols:
+            return None
+        key = position_key(board, player)
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            found, row, col = RECORD.unpack_from(self.data, HEADER.size + mid * RECORD.size)
+            if found < key:
+                low = mid + 1
+            elif found > key:
+                high = mid
+            else:
+                # A hash collision must not make the bot play an illegal move
+                if board[row][col] * player < 0:
+                    return None
+                return (row, col)
+        return None
+
+    def close(self):
+        self.data.close()
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Open a book, or give None when there is no usable book file, so that
+    bots simply search every move.
+
+    Returns:
+    OpeningBook: The book, or None.
+    """
+    try:
+        return OpeningBook(path)
+    except (OSError, ValueError):
+        return None
+
+
+# Books opened by default_book, by path, shared by every bot in the process
+open_books = {}
+
+
+def default_book():
+    """
+    Open the shipped book, once per process.
+
+    Returns:
+    OpeningBook: The book at BOOK_PATH, or None when it is missing.
+    """
+    if BOOK_PATH not in open_books:
+        open_books[BOOK_PATH] = load_book(BOOK_PATH)
+    return open_books[BOOK_PATH]
+
+
+def game_over(board):
+    # One side has no pieces left
+    cells = [cell for row in board for cell in row]
+    return all(cell >= 0 for cell in cells) or all(cell <= 0 for cell in cells)
+
+
+def book_moves(plies=4, depth=6, rows=GRID_SIZE[0], cols=GRID_SIZE[1]):
+    """
+    Search the opening for both sides.
+
+    Parameters:
+    plies (int): Moves into the game the book covers.
+    depth (int): Height of the alpha-beta search for each book move. Odd
+                 heights end on the opponent's horizon and rarely pick a
+                 move, so this should be even.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    dict: Position key -> (row, col) of the move found for it.
+    """
+    start = [[0] * cols for _ in range(rows)]
+    start[0][0] = 1
+    start[rows - 1][cols - 1] = -1
+    moves = {}
+
+    for side in (1, -1):
+        table = HashTable()
+        seen = set()
+        stack = [(start, 1, 0)]
+        while stack:
+            board, player, ply = stack.pop()
+            key = position_key(board, player)
+            if ply >= plies or key in seen or (ply > 1 and game_over(board)):
+                continue
+            seen.add(key)
+            if player == side:
+                tree = GameTree(board, player, depth, search="alphabeta", table=table)
+                move = tree.best_root_move if tree.get_move() is not None else None
+                if move is None:
+                    continue
+                moves[key] = move
+                stack.append((play(board, move, player), -player, ply + 1))
+            else:
+                for i in range(rows):
+                    for j in range(cols):
+                        if board[i][j] * player >= 0:
+                            stack.append((play(board, (i, j), player), -player, ply + 1))
+    return moves
+
+
+def write_book(moves, path, rows=GRID_SIZE[0], cols=GRID_SIZE[1]):
+    """
+    Write book moves to a file.
+
+    Parameters:
+    moves (dict): Position key -> (row, col), as made by book_moves.
+    path (str): The file to write.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+    """
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, rows, cols, len(moves)))
+        for key in sorted(moves):
+            row, col = moves[key]
+            f.write(RECORD.pack(key, row, col))
+
+
+def build_book(path=BOOK_PATH, plies=4, depth=6, rows=GRID_SIZE[0], cols=GRID_SIZE[1]):
+    """
+    Search the opening and write the book.
+
+    Returns:
+    int: Number of positions in the book.
+    """
+    moves = book_moves(plies, depth, rows, cols)
+    write_book(moves, path, rows, cols)
+    return len(moves)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the opening book.")
+    parser.add_argument("--plies", type=int, default=4, help="moves into the game the book covers")
+    parser.add_argument("--depth", type=int, default=6, help="search height for each book move, even")
+    parser.add_argument("--output", default=BOOK_PATH)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = build_book(args.output, args.plies, args.depth)
+    print("{} positions written to {} in {:.1f}s".format(count, args.output, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
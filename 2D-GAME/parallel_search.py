@@ -0,0 +1,110 @@
+# Root-parallel alpha-beta search.
+#
+# The root moves are dealt out to a pool of worker processes. Each worker
+# runs an ordinary alpha-beta GameTree restricted to its share of the root
+# moves and reports the best of them; the results are then combined into
+# the move the sequential search would pick. The pool is created on first
+# use and kept until close(), so the process start-up cost is only paid once.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from a2_partb import GameTree, possible_moves
+
+# Shares of root moves per worker; more than one evens out uneven subtrees.
+CHUNKS_PER_WORKER = 2
+
+
+def search_moves(board, player, tree_height, moves, transposition):
+    """
+    Search some of the root moves. Runs in a worker process.
+
+    Parameters:
+    board (list of list of int): The board at the root.
+    player (int): The player to move (1 or -1).
+    tree_height (int): The height of the search.
+    moves (list of tuple): The root moves to search, in root order.
+    transposition (bool): Use a transposition table in the worker.
+
+    Returns:
+    tuple: (best score, root move that got it, move get_move would return
+           for it, nodes searched). The root move is None when no move
+           scored below inf.
+    """
+    tree = GameTree(board, player, tree_height, search="alphabeta",
+                    transposition=transposition, root_moves=moves)
+    return tree.best_score, tree.best_root_move, tree.get_move(), tree.nodes
+
+
+class RootParallelSearch:
+    def __init__(self, workers=None, transposition=False):
+        """
+        Parameters:
+        workers (int): Number of worker processes, one per CPU when None.
+        transposition (bool): Give every worker its own transposition table.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.transposition = transposition
+        self.pool = None
+        self.nodes = 0
+
+    def get_pool(self):
+        """
+        Get the worker pool, starting it on first use.
+
+        Returns:
+        ProcessPoolExecutor: The pool.
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def search(self, board, player, tree_height=4):
+        """
+        Find the move GameTree(board, player, tree_height).get_move() returns.
+
+        Parameters:
+        board (list of list of int): The current game board.
+        player (int): The player to move (1 or -1).
+        tree_height (int): The height of the search.
+
+        Returns:
+        tuple: The row and column of the move, None when there is none.
+        """
+        self.nodes = 0
+        moves = possible_moves(board, player)
+        if tree_height <= 0 or not moves:
+            return None
+        count = min(len(moves), self.workers * CHUNKS_PER_WORKER)
+        pool = self.get_pool()
+        futures = [pool.submit(search_moves, board, player, tree_height, moves[i::count], self.transposition)
+                   for i in range(count)]
+
+        # The sequential search keeps the first root move with the strictly
+        # lowest score, so ties go to the move that comes first at the root
+        order = {move: index for index, move in enumerate(moves)}
+        best = None
+        best_move = None
+        for future in futures:
+            score, root_move, move, nodes = future.result()
+            self.nodes += nodes
+            if root_move is None:
+                continue
+            if best is None or (score, order[root_move]) < best:
+                best = (score, order[root_move])
+                best_move = move
+        return best_move
+
+    def close(self):
+        """
+        Shut the worker processes down.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
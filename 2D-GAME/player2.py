@@ -1,14 +1,9 @@
-from a2_partb import GameTree
+from search_player import SearchPlayer
+from opening_book import default_book
 
-class PlayerTwo:
+class PlayerTwo(SearchPlayer):
 
-    def __init__(self, name = "P2 Bot"):
-        self.name = name
-
-    def get_name(self):
-        return self.name
-
-    def get_play(self, board):
-        tree = GameTree(board, -1)
-        (row,col) = tree.get_move()
-        return (row,col)
\ No newline at end of file
+    def __init__(self, name = "P2 Bot", search = "alphabeta", use_book = True, **budget):
+        # budget: tree_height, time_limit, node_limit and max_depth, see SearchPlayer
+        # use_book: play the opening from opening_book.bin when it is there
+        super().__init__(-1, name, search, book=default_book() if use_book else None, **budget)
@@ -0,0 +1,204 @@
+import threading
+import time
+
+from a1_partc import Queue
+from a1_partd import overflow
+from a2_parta import BoundedHashTable
+from a2_partb import GameTree, iterative_deepening, evaluate_board, SearchTimeout
+from board_state import BoardState
+from flat_board import FlatBoard
+from parallel_search import RootParallelSearch
+
+# Slots of a reused transposition table. It is kept this size over a whole
+# game; when full, two-tier replacement keeps the deepest results
+TABLE_SIZE = 1 << 18
+
+def play(board, move, player):
+    """
+    Make a move with the game's rules: add the piece and let a1_partd
+    overflow it until the board settles.
+
+    Parameters:
+    board (list of list of int): The board before the move.
+    move (tuple): The row and column of the move.
+    player (int): The player making the move (1 or -1).
+
+    Returns:
+    list of list of int: The board after the move, a new list.
+    """
+    board = [row[:] for row in board]
+    board[move[0]][move[1]] += player
+    overflow(board, Queue())
+    return board
+
+class SearchPlayer:
+    """
+    Bot that picks its moves with a GameTree search.
+
+    With no budget every move is a fixed height search. Giving a time or
+    node budget switches to iterative deepening, so each move takes at most
+    the budget and returns the move of the deepest search that finished.
+
+    With reuse the bot keeps its transposition table from one move to the
+    next, so positions searched last turn start with their results and best
+    moves already known. With ponder it also keeps searching on the
+    opponent's time: the positions the opponent's replies lead to are
+    searched in the background, likeliest first, until get_play is called
+    again.
+
+    With a book, positions in the opening book are answered from it and
+    only the rest are searched.
+    """
+
+    def __init__(self, player, name, search="alphabeta", tree_height=4,
+                 time_limit=None, node_limit=None, max_depth=None, flat=False,
+                 incremental=False, workers=None, reuse=False, ponder=False,
+                 book=None, symmetry=False, reduce_moves=False):
+        """
+        Parameters:
+        player (int): The player the bot plays for (1 or -1).
+        name (str): The name of the bot.
+        search (str): Search mode for fixed height searches.
+        tree_height (int): Height of fixed height searches.
+        time_limit (float): Seconds each move may take.
+        node_limit (int): Nodes each move may visit.
+        max_depth (int): Deepest iterative deepening search, unlimited
+                         when None.
+        flat (bool): Search on FlatBoard copies of the board.
+        incremental (bool): Search on BoardStates, which keep piece counts
+                            up to date so that scoring a board is O(1).
+        workers (int): Split fixed height alpha-beta searches over this
+                       many processes. The pool lives until close().
+        reuse (bool): Keep the transposition table between moves.
+        ponder (bool): Search the likely next positions while the opponent
+                       thinks. Implies reuse.
+        book (OpeningBook): Opening book to play from before searching.
+        symmetry (bool): Skip root moves that mirror others and share table
+                         entries between mirror images, see GameTree.
+        reduce_moves (bool): Search one of each group of equivalent moves,
+                             see GameTree.
+        """
+        if (reuse or ponder) and (search != "alphabeta" or workers is not None):
+            raise ValueError("reuse and ponder need the sequential alphabeta search")
+        if (symmetry or reduce_moves) and (search != "alphabeta" or workers is not None):
+            raise ValueError("symmetry and reduce_moves need the sequential alphabeta search")
+        self.player = player
+        self.name = name
+        self.search = search
+        self.tree_height = tree_height
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.flat = flat
+        self.incremental = incremental
+        self.parallel = None
+        if workers is not None:
+            self.parallel = RootParallelSearch(workers)
+        self.last_depth = 0
+        self.ponder = ponder
+        self.table = BoundedHashTable(TABLE_SIZE, "two_tier") if reuse or ponder else None
+        self.ponder_thread = None
+        self.ponder_stop = None
+        self.pondered = 0  # positions the last pondering finished
+        self.book = book
+        self.symmetry = symmetry
+        self.reduce_moves = reduce_moves
+
+    def get_name(self):
+        return self.name
+
+    def search_board(self, board):
+        # The board type the searches run on
+        if self.flat and not isinstance(board, FlatBoard):
+            return FlatBoard.from_list(board)
+        if self.incremental and not isinstance(board, BoardState):
+            return BoardState([row[:] for row in board])
+        return board
+
+    def get_play(self, board, stop=None):
+        # stop: an Event that, once set, ends the search early. A fixed
+        # height alpha-beta search then raises SearchTimeout; iterative
+        # deepening returns the move of the deepest search that finished
+        self.stop_pondering()
+        position = board
+        move = None
+        if self.book is not None:
+            move = self.book.lookup(board, self.player)
+        if move is not None:
+            (row,col) = move
+        elif self.time_limit is None and self.node_limit is None:
+            board = self.search_board(board)
+            if self.parallel is not None and self.search == "alphabeta":
+                (row,col) = self.parallel.search(board, self.player, self.tree_height)
+            else:
+                tree = GameTree(board, self.player, self.tree_height, search=self.search, table=self.table,
+                                stop=stop if self.search == "alphabeta" else None,
+                                symmetry=self.symmetry, reduce_moves=self.reduce_moves)
+                (row,col) = tree.get_move()
+            self.last_depth = self.tree_height
+        else:
+            (row,col), self.last_depth = iterative_deepening(
+                self.search_board(board), self.player, self.time_limit, self.node_limit,
+                self.max_depth, self.table, self.symmetry, self.reduce_moves, stop)
+        if self.ponder and isinstance(position, list) and (stop is None or not stop.is_set()):
+            self.start_pondering(position, (row,col))
+        return (row,col)
+
+    def start_pondering(self, board, move):
+        """
+        Start searching, in the background, the positions the opponent can
+        reply with after this bot's move.
+
+        Parameters:
+        board (list of list of int): The board the move was picked on.
+        move (tuple): The move this bot is about to play.
+        """
+        depth = self.tree_height if self.time_limit is None and self.node_limit is None else max(self.last_depth, 1)
+        self.pondered = 0
+        self.ponder_stop = threading.Event()
+        self.ponder_thread = threading.Thread(target=self.ponder_positions,
+                                              args=(board, move, depth, self.ponder_stop), daemon=True)
+        self.ponder_thread.start()
+
+    def ponder_positions(self, board, move, depth, stop):
+        # Runs on the pondering thread until every reply is searched or stop is set
+        # Let the thread that started this one return from get_play first
+        time.sleep(0)
+        after = play(board, move, self.player)
+        cells = [cell for row in after for cell in row]
+        if all(cell * self.player >= 0 for cell in cells) or all(cell * self.player <= 0 for cell in cells):
+            return  # the game is over
+        opponent = -self.player
+        positions = []
+        for i in range(len(after)):
+            for j in range(len(after[0])):
+                if after[i][j] == 0 or after[i][j] * opponent > 0:
+                    if stop.is_set():
+                        return
+                    positions.append(play(after, (i, j), opponent))
+        # The replies that look best for the opponent are the likeliest
+        positions.sort(key=lambda position: evaluate_board(position, opponent), reverse=True)
+        for position in positions:
+            try:
+                GameTree(self.search_board(position), self.player, depth, search="alphabeta",
+                         table=self.table, stop=stop, symmetry=self.symmetry,
+                         reduce_moves=self.reduce_moves)
+            except SearchTimeout:
+                return
+            self.pondered += 1
+
+    def stop_pondering(self):
+        """
+        Stop the background search, waiting for it so the transposition
+        table is not used by two searches at once.
+        """
+        if self.ponder_thread is not None:
+            self.ponder_stop.set()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+
+    def close(self):
+        # Stop pondering and the worker processes of a parallel search, if any
+        self.stop_pondering()
+        if self.parallel is not None:
+            self.parallel.close()
@@ -0,0 +1,204 @@
+# Board symmetries.
+#
+# Flipping a board upside down or left to right, or turning it half way
+# round, gives a board that plays exactly the same with the moves mapped
+# the same way; square boards can also be transposed. A symmetry is stored
+# as (transpose, flip_rows, flip_cols): a cell (i, j) is first transposed to
+# (j, i) if transpose is set, then its row and column are mirrored if the
+# flips are set. The symmetries of a board shape form a group, so a
+# position can be replaced by a canonical representative of its class, the
+# smallest of its images, and results found for one position reused for
+# all its mirror images.
+
+from zobrist import ZOBRIST
+
+IDENTITY = (0, 0, 0)
+
+
+def symmetries(rows, cols):
+    """
+    Get the symmetries of a board shape.
+
+    Parameters:
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    list of tuple: The identity first, then the flips and the half turn,
+                   and for square boards the four that transpose.
+    """
+    result = [(0, 0, 0), (0, 1, 0), (0, 0, 1), (0, 1, 1)]
+    if rows == cols:
+        result += [(1, 0, 0), (1, 1, 0), (1, 0, 1), (1, 1, 1)]
+    return result
+
+
+def inverse(sym):
+    """
+    Get the symmetry that undoes another.
+
+    Returns:
+    tuple: The inverse symmetry.
+    """
+    transpose, flip_rows, flip_cols = sym
+    if transpose:
+        # (i, j) -> (j, i) -> mirrored; undoing it swaps which axis is mirrored
+        return (1, flip_cols, flip_rows)
+    return sym
+
+
+def transform_move(move, sym, rows, cols):
+    """
+    Map a cell through a symmetry.
+
+    Parameters:
+    move (tuple): The row and column of the cell.
+    sym (tuple): The symmetry.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    tuple: The row and column of the image of the cell.
+    """
+    i, j = move
+    if sym[0]:
+        i, j = j, i
+    if sym[1]:
+        i = rows - 1 - i
+    if sym[2]:
+        j = cols - 1 - j
+    return (i, j)
+
+
+def transform_board(board, sym):
+    """
+    Map a board through a symmetry.
+
+    Parameters:
+    board (list of list of int): The board, or a FlatBoard.
+    sym (tuple): The symmetry.
+
+    Returns:
+    list of list of int: The image of the board, a new list.
+    """
+    if hasattr(board, "to_list"):
+        board = board.to_list()
+    rows, cols = len(board), len(board[0])
+    result = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        for j in range(cols):
+            x, y = transform_move((i, j), sym, rows, cols)
+            result[x][y] = board[i][j]
+    return result
+
+
+def canonical(board):
+    """
+    Find the canonical form of a board: the smallest of its images.
+
+    Parameters:
+    board (list of list of int): The board, or a FlatBoard.
+
+    Returns:
+    tuple: The canonical board and the symmetry that maps the board to it.
+           Moves are mapped to the canonical board with transform_move and
+           back with its inverse.
+    """
+    if hasattr(board, "to_list"):
+        board = board.to_list()
+    best, best_sym = None, IDENTITY
+    for sym in symmetries(len(board), len(board[0])):
+        image = transform_board(board, sym)
+        if best is None or image < best:
+            best, best_sym = image, sym
+    return best, best_sym
+
+
+def unique_moves(board, moves):
+    """
+    Drop moves that lead to a mirror image of an earlier move's position.
+
+    If a symmetry maps the board onto itself, it maps each move onto an
+    equivalent one. Only the first move of each such class is kept, so a
+    search that prefers the first of equally good moves picks the same move
+    from the shorter list.
+
+    Parameters:
+    board (list of list of int): The board, or a FlatBoard.
+    moves (list of tuple): The moves, in search order.
+
+    Returns:
+    list of tuple: The moves left, in the same order.
+    """
+    if hasattr(board, "to_list"):
+        board = board.to_list()
+    rows, cols = len(board), len(board[0])
+    keep = [sym for sym in symmetries(rows, cols)[1:] if transform_board(board, sym) == board]
+    if not keep:
+        return moves
+    seen = set()
+    result = []
+    for move in moves:
+        if move in seen:
+            continue
+        result.append(move)
+        for sym in keep:
+            seen.add(transform_move(move, sym, rows, cols))
+    return result
+
+
+def board_keys(board, syms):
+    """
+    Zobrist hash the images of a board.
+
+    Parameters:
+    board (list of list of int): The board, or a FlatBoard.
+    syms (list of tuple): The symmetries.
+
+    Returns:
+    tuple: The hash of the image of the board under each symmetry.
+    """
+    return tuple(ZOBRIST.hash_board(transform_board(board, sym)) for sym in syms)
+
+
+# Cell maps made by cell_maps, by (symmetries, rows, cols)
+maps_cache = {}
+
+
+def cell_maps(syms, rows, cols):
+    """
+    Get, for each symmetry, the image of every cell.
+
+    Returns:
+    list of dict: (row, col) -> (row, col) of its image, per symmetry.
+    """
+    cache_key = (tuple(syms), rows, cols)
+    if cache_key not in maps_cache:
+        cells = [(i, j) for i in range(rows) for j in range(cols)]
+        maps_cache[cache_key] = [{cell: transform_move(cell, sym, rows, cols) for cell in cells} for sym in syms]
+    return maps_cache[cache_key]
+
+
+def update_keys(keys, trail, syms, rows, cols):
+    """
+    Update the hashes of the images of a board with the changes recorded
+    while making a move.
+
+    Parameters:
+    keys (tuple): The hash of each image before the move.
+    trail (list of tuple): (row, col, old value, new value) per write.
+    syms (list of tuple): The symmetries keys was made with.
+    rows (int): Rows of the board.
+    cols (int): Columns of the board.
+
+    Returns:
+    tuple: The hash of each image after the move.
+    """
+    result = []
+    zobrist_key = ZOBRIST.key
+    for key, cell_map in zip(keys, cell_maps(syms, rows, cols)):
+        for row, col, old, new in trail:
+            i, j = cell_map[(row, col)]
+            key ^= zobrist_key(i, j, old) ^ zobrist_key(i, j, new)
+        result.append(key)
+    return tuple(result)
@@ -0,0 +1,117 @@
+#
+#   These are the unit tests for the overflow engines in a1_partd
+#   To use this, run: python test_a1_partd.py
+
+import random
+import unittest
+from a1_partc import Queue
+from a1_partd import overflow, set_overflow_engine, OVERFLOW_ENGINES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def random_grid(rng, rows, cols):
+    # mostly small values so that some cells start over capacity
+    return [[rng.choice([0, 0, 1, 2, 3, 4, -1, -2, -3, -4]) for _ in range(cols)] for _ in range(rows)]
+
+def run(grid, engine):
+    grid = [row[:] for row in grid]
+    q = Queue()
+    steps = overflow(grid, q, engine)
+    waves = []
+    while not q.is_empty():
+        waves.append(q.dequeue())
+    return steps, grid, waves
+
+class A1DTestCase(unittest.TestCase):
+    """These are the test cases for the overflow engines"""
+
+    def test_engines_match_recursive(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            grid = random_grid(rng, rng.randint(1, 7), rng.randint(1, 7))
+            try:
+                expected = run(grid, 'recursive')
+            except RecursionError:
+                # some random grids never settle; they are not game positions
+                continue
+            for engine in OVERFLOW_ENGINES:
+                if engine == 'numpy' and numpy is None:
+                    continue
+                self.assertEqual(run(grid, engine), expected, engine)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_large_grids(self):
+        rng = random.Random(77)
+        for _ in range(20):
+            grid = random_grid(rng, rng.randint(10, 40), rng.randint(10, 40))
+            self.assertEqual(run(grid, 'numpy'), run(grid, 'frontier'))
+
+        # overflow() uses the selected engine when none is passed
+        grid = [[2, 1, 0], [1, -1, 2]]
+        expected = run(grid, 'recursive')
+        set_overflow_engine('numpy')
+        try:
+            q = Queue()
+            self.assertEqual(overflow(grid, q), expected[0])
+            self.assertEqual(grid, expected[1])
+        finally:
+            set_overflow_engine('recursive')
+
+    def test_long_chain(self):
+        # a single row of full cells overflows one cell further every wave,
+        # far past where the recursive engine would hit the recursion limit
+        grid = [[-1] + [2] * 1500 + [-1]]
+        grid[0][1] = 3
+        steps, grid, waves = run(grid, 'frontier')
+        self.assertGreater(steps, 1000)
+        self.assertEqual(len(waves), steps)
+        self.assertEqual(waves[-1], grid)
+
+    def test_never_settles(self):
+        # the waves of this grid go round in a cycle
+        grid = [[-3, -2, -3], [-3, -3, -3], [-1, 3, -1]]
+        for engine in OVERFLOW_ENGINES:
+            if engine == 'numpy' and numpy is None:
+                continue
+            # RecursionError, from the recursive engine, is a RuntimeError
+            with self.assertRaises(RuntimeError):
+                run(grid, engine)
+
+    def test_deltas(self):
+        rng = random.Random(99)
+        for _ in range(200):
+            grid = random_grid(rng, rng.randint(1, 7), rng.randint(1, 7))
+            try:
+                steps, final, waves = run(grid, 'recursive')
+            except RecursionError:
+                continue
+            for engine in OVERFLOW_ENGINES:
+                if engine == 'numpy' and numpy is None:
+                    continue
+                board = [row[:] for row in grid]
+                q = Queue()
+                self.assertEqual(overflow(board, q, engine, deltas=True), steps)
+                self.assertEqual(board, final)
+                # replaying the changes of every wave gives its snapshot
+                replay = [row[:] for row in grid]
+                for wave in waves:
+                    changes = q.dequeue()
+                    for row, col, value in changes:
+                        self.assertNotEqual(replay[row][col], value)
+                        replay[row][col] = value
+                    self.assertEqual(replay, wave, engine)
+                    self.assertEqual(changes, sorted(changes))
+                self.assertTrue(q.is_empty())
+
+    def test_select_engine(self):
+        with self.assertRaises(ValueError):
+            overflow([[0]], Queue(), 'quantum')
+        with self.assertRaises(ValueError):
+            set_overflow_engine('quantum')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,10 @@
 #   These are the unit tests for functions and classes of assingment 1 part E
 #   To use this, run: python test_a2_parta.py
 
+import random
 import unittest
-from a2_parta import HashTable
+import a2_parta
+from a2_parta import HashTable, RobinHoodHashTable, BoundedHashTable
 
 class A2ATestCase(unittest.TestCase):
     """These are the test cases for functions and classes of a2"""
@@ -312,5 +314,120 @@ class A2ATestCase(unittest.TestCase):
 
 
 
+class RobinHoodTestCase(A2ATestCase):
+    """The same test cases, run on RobinHoodHashTable"""
+
+    def setUp(self):
+        global HashTable
+        HashTable = RobinHoodHashTable
+
+    def tearDown(self):
+        global HashTable
+        HashTable = a2_parta.HashTable
+
+    def test_matches_dict(self):
+        # small tables with many removals wrap around and shift entries back
+        rng = random.Random(5)
+        for max_load in (0.5, 0.7, 0.9):
+            table = RobinHoodHashTable(4, max_load)
+            expected = {}
+            for _ in range(3000):
+                key = rng.randrange(200)
+                action = rng.random()
+                if action < 0.45:
+                    self.assertEqual(table.insert(key, action), key not in expected)
+                    expected.setdefault(key, action)
+                elif action < 0.8:
+                    self.assertEqual(table.remove(key), key in expected)
+                    expected.pop(key, None)
+                else:
+                    self.assertEqual(table.modify(key, action), key in expected)
+                    if key in expected:
+                        expected[key] = action
+                self.assertEqual(len(table), len(expected))
+                self.assertLessEqual(len(table), table.capacity() * max_load)
+            for key in range(200):
+                self.assertEqual(table.search(key), expected.get(key))
+
+        with self.assertRaises(ValueError):
+            RobinHoodHashTable(32, 1.0)
+
+
+class BoundedHashTableTestCase(unittest.TestCase):
+    """Test cases for BoundedHashTable and its replacement policies"""
+
+    def test_policies(self):
+        # small ints hash to themselves: with 4 buckets 1, 5 and 9 share one
+        table = BoundedHashTable(4, "always")
+        self.assertTrue(table.insert(1, (3, "a")))
+        self.assertTrue(table.insert(5, (1, "b")))
+        self.assertEqual(table.search(1), None)
+        self.assertEqual(table.search(5), (1, "b"))
+        self.assertEqual(table.stats()["evictions"], 1)
+
+        table = BoundedHashTable(4, "depth")
+        self.assertTrue(table.insert(1, (3, "a")))
+        self.assertFalse(table.insert(5, (1, "b")))
+        self.assertTrue(table.insert(9, (3, "c")))
+        self.assertEqual(table.search(9), (3, "c"))
+        self.assertEqual(table.stats()["rejected"], 1)
+        self.assertEqual(table.stats()["evictions"], 1)
+
+        table = BoundedHashTable(8, "two_tier")
+        table.insert(1, (3, "a"))
+        table.insert(5, (1, "b"))
+        table.insert(9, (2, "c"))  # replaces the shallow entry, keeps the deep one
+        self.assertEqual(table.search(1), (3, "a"))
+        self.assertEqual(table.search(5), None)
+        table.insert(13, (4, "d"))  # the deep entry moves to the other slot
+        self.assertEqual(table.search(13), (4, "d"))
+        self.assertEqual(table.search(1), (3, "a"))
+        self.assertEqual(table.search(9), None)
+        self.assertEqual(len(table), 2)
+
+        table = BoundedHashTable(4, "lru")  # one bucket of four
+        for key in range(4):
+            table.insert(key, key)
+        table.search(0)
+        table.insert(4, 4)
+        self.assertEqual(table.search(1), None)
+        self.assertEqual(table.search(0), 0)
+        self.assertTrue(table.remove(3))
+        self.assertTrue(table.insert(5, 5))
+        self.assertEqual([table.search(key) for key in (0, 2, 4, 5)], [0, 2, 4, 5])
+        self.assertEqual(table.stats(), {"size": 4, "capacity": 4, "occupancy": 1.0,
+                                         "evictions": 1, "rejected": 0})
+
+        with self.assertRaises(ValueError):
+            BoundedHashTable(4, "random")
+
+    def test_never_grows(self):
+        rng = random.Random(7)
+        for policy in ("always", "depth", "two_tier", "lru"):
+            table = BoundedHashTable(64, policy)
+            expected = {}
+            for _ in range(5000):
+                key = rng.randrange(1000)
+                value = (rng.randrange(6), key)
+                if rng.random() < 0.2:
+                    table.remove(key)
+                    self.assertEqual(table.search(key), None)
+                    expected.pop(key, None)
+                    continue
+                if not table.insert(key, value):
+                    table.modify(key, value)
+                expected[key] = value
+                self.assertLessEqual(len(table), table.capacity())
+            # whatever is kept is the latest value stored for the key
+            found = 0
+            for key in range(1000):
+                value = table.search(key)
+                if value is not None:
+                    found += 1
+                    self.assertEqual(value, expected[key])
+            self.assertEqual(found, len(table))
+            self.assertEqual(table.capacity(), 64)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,8 +4,15 @@
 #   To use this, run: python test_a2_partc.py
 
 
+import threading
 import unittest
-from a2_partb import evaluate_board, GameTree
+from a2_partb import evaluate_board, GameTree, make_move, iterative_deepening, TooManyNodes
+from a2_partb import possible_moves, extract_move, evaluate_boards
+from flat_board import FlatBoard
+from board_state import BoardState
+from parallel_search import RootParallelSearch
+from search_player import SearchPlayer, play
+from zobrist import ZOBRIST
 
 class A2BTestCase(unittest.TestCase):
     """These are the test cases for functions and classes of a2"""
@@ -133,6 +140,342 @@ class A2BTestCase(unittest.TestCase):
         self.assertNotEqual((row,col), (4,0))
         self.assertNotEqual((row,col), (4,5))
 
+    def test_alphabeta_matches_minimax(self):
+        boards = [
+                    [
+                    [ 0 , 2,  -2, 0, 0,  0],
+                    [ 0,  0 , -3,  -1,  0,  0],
+                    [ 0,  0,  0,  0,  0, 0],
+                    [ 0,  0,  0,  0,  2, 0],
+                    [ 0,  0,  0,  2,  0, 0]
+                    ],
+                    [
+                    [ 0 , 0,  0,  0,  0,  0],
+                    [ -1, 0,  0,  0,  0,  -1],
+                    [ -2, 3,  3,  3,  3, -2],
+                    [ -1, 0,  0,  0,  0, -1],
+                    [ 0,  0,  -2,  -1,  0,  0]
+                    ],
+                    [
+                    [ 1,  -1, 0],
+                    [ 0,  2, -2],
+                    [ 0,  0,  0]
+                    ],
+                    [
+                    [ 1, 1],
+                    [ 1, 0]
+                    ]
+        ]
+
+        # the pruned search must pick exactly the move of the full tree
+        for board in boards:
+            for player in (1, -1):
+                for height in range(4):
+                    full = GameTree(board, player, height)
+                    pruned = GameTree(board, player, height, search="alphabeta")
+                    self.assertEqual(pruned.get_move(), full.get_move())
+
+        with self.assertRaises(ValueError):
+            GameTree(boards[0], 1, search="best-first")
+
+
+    def test_transposition_table(self):
+        board = [
+                    [ 1,  0,  2,  0, -1,  0],
+                    [ 0,  2 , 0,  0,  0,  0],
+                    [ 2,  0,  3,  0,  0, 0],
+                    [ 0,  0,  0,  -3,  0, 0],
+                    [ 0,  0,  0,  0, -2, -1]
+                ]
+
+        # hashes updated from the move's trail match hashing from scratch
+        for move in [(0, 0), (2, 2), (3, 5), (4, 4)]:
+            for player in (1, -1):
+                trail = []
+                new_board = make_move(board, move, player, trail)
+                self.assertEqual(ZOBRIST.update(ZOBRIST.hash_board(board), trail),
+                                 ZOBRIST.hash_board(new_board))
+
+        for player in (1, -1):
+            plain = GameTree(board, player, 4, search="alphabeta")
+            cached = GameTree(board, player, 4, search="alphabeta", transposition=True)
+            self.assertEqual(cached.get_move(), plain.get_move())
+            self.assertGreater(cached.tt_hits + cached.tt_misses, 0)
+
+        with self.assertRaises(ValueError):
+            GameTree(board, 1, transposition=True)
+
+
+    def test_iterative_deepening(self):
+        board = [
+                    [ 1,  0,  0,  0,  0,  0],
+                    [ 0,  0 , 0,  0,  0,  0],
+                    [ 0,  0,  2,  0,  0,  0],
+                    [ 0,  0,  0,  -2,  0, 0],
+                    [ 0,  0,  0,  0,  0, -1]
+                ]
+
+        # a depth limit alone runs every iteration up to that height
+        (move, depth) = iterative_deepening(board, 1, max_depth=4)
+        self.assertEqual(depth, 4)
+        self.assertEqual(move, GameTree(board, 1, 4, search="alphabeta").get_move())
+
+        # a tiny node budget still returns a legal move
+        (move, depth) = iterative_deepening(board, -1, node_limit=3)
+        self.assertLessEqual(depth, 1)
+        (row, col) = move
+        self.assertLessEqual(board[row][col], 0)
+
+        (move, depth) = iterative_deepening(board, 1, time_limit=0.05)
+        self.assertIsNotNone(move)
+
+        # a stop that is already set ends the search before the first iteration
+        stop = threading.Event()
+        stop.set()
+        self.assertEqual(iterative_deepening(board, 1, max_depth=4, stop=stop), ((0, 0), 0))
+
+        with self.assertRaises(ValueError):
+            iterative_deepening(board, 1)
+
+
+    def test_streaming_search(self):
+        board = [
+                    [ 0 , 0,  0,  0,  0,  0],
+                    [ -1, 0,  0,  0,  0,  -1],
+                    [ -2, 3,  3,  3,  3, -2],
+                    [ -1, 0,  0,  0,  0, -1],
+                    [ 0,  0,  -2,  -1,  0,  0]
+                ]
+
+        # streaming keeps only the current path alive but scores like minimax
+        for height in range(4):
+            full = GameTree(board, 1, height)
+            streamed = GameTree(board, 1, height, search="streaming", max_live_nodes=height + 1)
+            self.assertEqual(streamed.get_move(), full.get_move())
+            self.assertLessEqual(streamed.peak_live_nodes, height + 1)
+            self.assertEqual(streamed.nodes, full.nodes)
+
+        # building the whole tree goes over the cap
+        with self.assertRaises(TooManyNodes):
+            GameTree(board, 1, 3, max_live_nodes=100)
+
+
+    def test_flat_board(self):
+        boards = [
+                    [
+                    [ 0 , 2,  -2, 0, 0,  0],
+                    [ 0,  0 , -3,  -1,  0,  0],
+                    [ 0,  0,  0,  0,  0, 0],
+                    [ 0,  0,  0,  0,  2, 0],
+                    [ 0,  0,  0,  2,  0, 0]
+                    ],
+                    [
+                    [ 1, -1, 3],
+                    [ 0,  2, -2]
+                    ],
+                    [
+                    [ 2, -1, 0, 1]
+                    ]
+        ]
+        for board in boards:
+            flat = FlatBoard.from_list(board)
+            self.assertEqual(flat.to_list(), board)
+            copy = flat.copy()
+            copy.set(0, 0, 3)
+            self.assertEqual(flat.get(0, 0), board[0][0])
+
+            # every rule gives the same answer on both representations
+            for player in (1, -1):
+                self.assertEqual(evaluate_board(flat, player), evaluate_board(board, player))
+                moves = possible_moves(board, player)
+                self.assertEqual(possible_moves(flat, player), moves)
+                for move in moves:
+                    new_board = make_move(board, move, player)
+                    new_flat = make_move(flat, move, player)
+                    self.assertEqual(new_flat.to_list(), new_board)
+                    self.assertEqual(extract_move(flat, new_flat), extract_move(board, new_board))
+                self.assertEqual(GameTree(board, player, 3, search="alphabeta", flat=True).get_move(),
+                                 GameTree(board, player, 3).get_move())
+
+
+    def test_evaluate_boards(self):
+        boards = [
+                    [
+                    [ 1 , 0,  2,  0, 0,  0],
+                    [ 0,  2 , 0,  0,  0,  0],
+                    [ 2,  0,  3,  0,  0, 0],
+                    [ 0,  0,  0,  -3,  0, 0],
+                    [ 0,  0,  0,  0, -2, -1]
+                    ],
+                    [
+                    [ 0 , 1,  1,  0, 0,  0],
+                    [ 1,  0 , 0,  0,  0,  0],
+                    [ 0,  0,  0,  1,  0, 0],
+                    [ 0,  0,  1,  0,  0, 0],
+                    [ 0,  0,  0,  0,  0, 0]
+                    ],
+                    [
+                    [ 0 , -1,  -1,  0, 0,  0],
+                    [ -1,  0 , 0,  0,  0,  0],
+                    [ 0,  0,  0,  0,  0, 0],
+                    [ 0,  0,  0,  0,  0, 0],
+                    [ 0,  0,  0,  0,  0, 0]
+                    ]
+        ]
+        for player in (1, -1):
+            expected = [evaluate_board(board, player) for board in boards]
+            self.assertEqual(evaluate_boards(boards, player), expected)
+            flat = [FlatBoard.from_list(board) for board in boards]
+            self.assertEqual(evaluate_boards(flat, player), expected)
+        self.assertEqual(evaluate_boards([], 1), [])
+
+        # a board where every move but one leaves p1 without moves
+        board = [
+                    [ 1, 1],
+                    [ 1, 0]
+                ]
+        for height in range(4):
+            full = GameTree(board, -1, height)
+            batched = GameTree(board, -1, height, batch_eval=True)
+            self.assertEqual(batched.get_move(), full.get_move())
+            self.assertEqual(batched.root.score, full.root.score)
+
+
+    def test_board_state(self):
+        board = [
+                    [ 1 , 0,  2,  0, 0,  0],
+                    [ 0,  2 , 0,  0,  0,  0],
+                    [ 2,  0,  3,  0,  0, 0],
+                    [ 0,  0,  0,  -3,  0, 0],
+                    [ 0,  0,  0,  0, -2, -1]
+                ]
+        state = BoardState([row[:] for row in board])
+        self.assertEqual(state.owned, {1: 5, -1: 3})
+        self.assertEqual(state.material, {1: 10, -1: 6})
+
+        # counts follow every move, including the overflow it causes
+        player = 1
+        for move in [(2, 2), (3, 3), (0, 0), (4, 4), (1, 1)]:
+            state = make_move(state, move, player)
+            board = make_move(board, move, player)
+            self.assertEqual(state.board, board)
+            recounted = BoardState([row[:] for row in board])
+            self.assertEqual(state.owned, recounted.owned)
+            self.assertEqual(state.material, recounted.material)
+            for p in (1, -1):
+                self.assertEqual(evaluate_board(state, p), evaluate_board(board, p))
+            player = -player
+
+        state.set(4, 5, 0)
+        state.set(3, 3, 0)
+        for row in range(5):
+            for col in range(6):
+                if state.board[row][col] < 0:
+                    state.set(row, col, 0)
+        self.assertEqual(state.winner(), 1)
+        self.assertEqual(evaluate_board(state, 1), evaluate_board(state.board, 1))
+
+
+    def test_root_parallel_search(self):
+        boards = [
+                    [
+                    [ 0 , -2, 2, 0, 0,  0],
+                    [ 0,  0,  3,  1,  0,  0],
+                    [ 0,  0, -1,  0,  0, 0],
+                    [ 0,  0,  0,  0, -2, 0],
+                    [ 0,  0,  0,  -2,  0, 0]
+                    ],
+                    [
+                    [ 0 , 0,  0,  0,  0,  0],
+                    [ 1, 0,  0,  0,  0,  1],
+                    [ 2, -3,  -3,  -3,  -3, 2],
+                    [ 1, 0,  0,  0,  0, 1],
+                    [ 0,  0,  2,  1,  0,  0]
+                    ],
+                    [
+                    [ 1, 1],
+                    [ 1, 0]
+                    ]
+        ]
+
+        # one pool serves every search and combines to the sequential move
+        with RootParallelSearch(2) as search:
+            for board in boards:
+                for player in (1, -1):
+                    for height in (1, 2, 3):
+                        expected = GameTree(board, player, height, search="alphabeta").get_move()
+                        self.assertEqual(search.search(board, player, height), expected)
+            pool = search.pool
+            search.search(boards[0], 1)
+            self.assertIs(search.pool, pool)
+        self.assertIsNone(search.pool)
+
+
+    def test_search_reuse(self):
+        board = [
+                    [ 1,  0,  0,  0,  0,  0],
+                    [ 0,  0 , 0,  0,  0,  0],
+                    [ 0,  0,  2,  0,  0,  0],
+                    [ 0,  0,  0,  -2,  0, 0],
+                    [ 0,  0,  0,  0,  0, -1]
+                ]
+
+        plain = SearchPlayer(1, "plain")
+        reused = SearchPlayer(1, "reused", reuse=True)
+        pondering = SearchPlayer(1, "pondering", ponder=True)
+        # the reply p2 would make, with the game's rules
+        replies = [(3, 3), (4, 5), (0, 5)]
+        for reply in replies:
+            move = plain.get_play(board)
+            self.assertEqual(reused.get_play(board), move)
+            self.assertEqual(pondering.get_play(board), move)
+            # let the background search run through every reply
+            pondering.ponder_thread.join()
+            self.assertGreater(pondering.pondered, 0)
+            board = play(play(board, move, 1), reply, -1)
+        self.assertGreater(len(reused.table), 0)
+        pondering.close()
+        self.assertIsNone(pondering.ponder_thread)
+
+        with self.assertRaises(ValueError):
+            SearchPlayer(1, "p", search="minimax", ponder=True)
+
+    def test_reduce_moves(self):
+        board = [
+                    [ 1,  0,  0,  0,  0,  0],
+                    [ 0,  0 , 0,  0,  0,  0],
+                    [ 0,  0,  0,  0,  0,  0],
+                    [ 0,  0,  0,  0,  0, 0],
+                    [ 0,  0,  0,  0,  0, -1]
+                ]
+        # the cells next to a piece, and the first isolated edge, corner
+        # and middle cell
+        self.assertEqual(possible_moves(board, 1, reduce_moves=True),
+                         [(0, 0), (0, 1), (0, 2), (0, 5), (1, 0), (1, 1), (3, 5), (4, 4)])
+        self.assertEqual(possible_moves(board, -1, reduce_moves=True),
+                         [(0, 1), (0, 2), (0, 5), (1, 0), (1, 1), (3, 5), (4, 4), (4, 5)])
+        self.assertEqual(possible_moves(FlatBoard.from_list(board), 1, reduce_moves=True),
+                         possible_moves(board, 1, reduce_moves=True))
+        # every isolated cell of a capacity leaves a board scored the same
+        kept = {2: (0, 5), 3: (0, 2), 4: (1, 1)}
+        for i, j in possible_moves(board, 1):
+            if (i, j) not in possible_moves(board, 1, reduce_moves=True):
+                capacity = (i > 0) + (i < 4) + (j > 0) + (j < 5)
+                self.assertEqual(evaluate_board(make_move(board, (i, j), 1), 1),
+                                 evaluate_board(make_move(board, kept[capacity], 1), 1))
+
+        # fewer nodes, the same moves here
+        board[2][2] = 2
+        board[3][3] = -2
+        for player in (1, -1):
+            plain = GameTree(board, player, 6, search="alphabeta")
+            reduced = GameTree(board, player, 6, search="alphabeta", reduce_moves=True)
+            self.assertEqual(reduced.get_move(), plain.get_move())
+            self.assertLess(reduced.nodes, plain.nodes)
+        with self.assertRaises(ValueError):
+            GameTree(board, 1, 2, search="minimax", reduce_moves=True)
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+#
+#   These are the unit tests for the headless arena
+#   To use this, run: python test_arena.py
+
+import unittest
+from arena import play_game, run_arena, percentile
+
+class FirstCellBot:
+    # player 1: plays the first empty or own cell
+    def get_play(self, board):
+        for i in range(len(board)):
+            for j in range(len(board[0])):
+                if board[i][j] >= 0:
+                    return (i, j)
+
+class LastCellBot:
+    # player 2: plays the last empty or own cell
+    def get_play(self, board):
+        for i in reversed(range(len(board))):
+            for j in reversed(range(len(board[0]))):
+                if board[i][j] <= 0:
+                    return (i, j)
+
+class OffBoardBot:
+    def get_play(self, board):
+        return (len(board), 0)
+
+class ArenaTestCase(unittest.TestCase):
+
+    def test_play_game(self):
+        result = play_game(FirstCellBot, LastCellBot, seed=3, random_plies=4, max_moves=200)
+        self.assertIn(result["winner"], (1, -1, 0))
+        self.assertFalse(result["forfeit"] and result["winner"] == 0)
+        # same seed, same game
+        self.assertEqual(play_game(FirstCellBot, LastCellBot, seed=3, random_plies=4, max_moves=200)["moves"], result["moves"])
+
+        # a move off the board loses, as in game.py
+        result = play_game(FirstCellBot, OffBoardBot)
+        self.assertEqual(result["winner"], 1)
+        self.assertTrue(result["forfeit"])
+        self.assertEqual(result["moves"], 1)
+        self.assertEqual(len(result["latencies"][1]), 1)
+
+        # the move cap ends the game as a draw
+        result = play_game(FirstCellBot, LastCellBot, max_moves=0)
+        self.assertEqual(result["winner"], 0)
+
+    def test_run_arena(self):
+        summary = run_arena(FirstCellBot, OffBoardBot, games=6, workers=1, random_plies=1)
+        self.assertEqual(summary["games"], 6)
+        self.assertEqual(summary["p1_wins"] + summary["p2_wins"] + summary["draws"], 6)
+        self.assertEqual(summary["forfeits"], 6)
+        self.assertEqual(summary["p1_win_rate"], 1.0)
+        self.assertEqual(summary["p2_latency"]["moves"], 6)
+
+        self.assertEqual(run_arena(FirstCellBot, OffBoardBot, games=6, workers=2, random_plies=1)["p1_wins"], 6)
+
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2)
+        self.assertEqual(percentile([3, 1, 2, 4], 99), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#
+#   These are the unit tests for the batch playout kernel
+#   To use this, run: python test_batch_playout.py
+
+import random
+import unittest
+from search_player import play
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+else:
+    from a1_partd import numpy_capacity
+    from batch_playout import play_moves, random_playouts, settle, winners
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class BatchPlayoutTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.start = [[0] * 6 for _ in range(5)]
+        self.start[0][0] = 1
+        self.start[4][5] = -1
+
+    def test_play_moves(self):
+        # every game moves exactly as the game's own rules would move it
+        rng = random.Random(2)
+        boards, moves, players = [], [], []
+        for _ in range(300):
+            board, player = self.start, 1
+            for _ in range(rng.randrange(25)):
+                move = rng.choice([(i, j) for i in range(5) for j in range(6) if board[i][j] * player >= 0])
+                board = play(board, move, player)
+                player = -player
+                if winners(np.array([board]))[0] != 0:
+                    break
+            boards.append(board)
+            moves.append(rng.choice([(i, j) for i in range(5) for j in range(6) if board[i][j] * player >= 0]))
+            players.append(player)
+        a = np.array(boards)
+        play_moves(a, np.array([i * 6 + j for i, j in moves]), np.array(players))
+        for k in range(len(boards)):
+            self.assertEqual(a[k].tolist(), play(boards[k], moves[k], players[k]))
+
+    def test_never_settles(self):
+        # the waves of the second game go round in a cycle
+        boards = np.array([[[2, 0, 0], [0, 0, 0], [0, 0, -1]],
+                           [[-3, -2, -3], [-3, -3, -3], [-1, 3, -1]]])
+        self.assertEqual(settle(boards[:1], numpy_capacity(3, 3)).tolist(), [1])
+        with self.assertRaises(RuntimeError):
+            settle(boards, numpy_capacity(3, 3))
+
+    def test_random_playouts(self):
+        boards = np.array([self.start] * 50)
+        outcomes, moves, final = random_playouts(boards, 1, seed=3)
+        self.assertEqual(outcomes.tolist(), winners(final).tolist())
+        self.assertTrue(((outcomes == 1) | (outcomes == -1)).all())
+        self.assertTrue((moves > 0).all())
+        # the boards passed in are left alone and the seed fixes the games
+        self.assertEqual(boards[0].tolist(), self.start)
+        self.assertEqual(random_playouts(boards, 1, seed=3)[1].tolist(), moves.tolist())
+
+        # a single board, a game already over and a move cap
+        outcomes, moves, _ = random_playouts(self.start, -1, max_moves=0)
+        self.assertEqual((outcomes.tolist(), moves.tolist()), ([0], [0]))
+        outcomes, moves, _ = random_playouts([[[0, 2], [1, 0]]], 1)
+        self.assertEqual((outcomes.tolist(), moves.tolist()), ([1], [0]))
+
+if __name__ == '__main__':
+    unittest.main()
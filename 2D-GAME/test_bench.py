@@ -0,0 +1,41 @@
+#
+#   These are the unit tests for the benchmark suite
+#   To use this, run: python test_bench.py
+
+import os
+import tempfile
+import unittest
+from bench import build_benchmarks, run_benchmarks, compare, save_baseline, load_baseline
+
+class BenchTestCase(unittest.TestCase):
+
+    def test_workloads_are_seeded(self):
+        first = build_benchmarks(quick=True, seed=5)
+        second = build_benchmarks(quick=True, seed=5)
+        self.assertEqual([b[0] for b in first], [b[0] for b in second])
+        for (name, _, items1, _), (_, _, items2, _) in zip(first, second):
+            if name.startswith("overflow") or name.startswith("search"):
+                self.assertEqual(items1, items2)
+
+    def test_baseline(self):
+        results = run_benchmarks(quick=True, repeat=1, select="search/alphabeta/depth2")
+        result = results["search/alphabeta/depth2"]
+        self.assertGreater(result["ops_per_sec"], 0)
+        self.assertGreater(result["nodes_per_sec"], 0)
+        self.assertLessEqual(result["latency"]["p50"], result["latency"]["max"])
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baseline.json")
+            save_baseline(results, path, quick=True)
+            baseline = load_baseline(path)
+        self.assertEqual(baseline, results)
+
+        slower = {"search/alphabeta/depth2": dict(result, ops_per_sec=result["ops_per_sec"] / 2)}
+        (name, old, new, ratio, regressed), = compare(slower, baseline)
+        self.assertTrue(regressed)
+        self.assertAlmostEqual(ratio, 0.5)
+        self.assertFalse(compare(results, baseline)[0][4])
+        self.assertEqual(compare({"other": result}, baseline), [])
+
+if __name__ == '__main__':
+    unittest.main()
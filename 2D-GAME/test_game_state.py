@@ -0,0 +1,244 @@
+#
+#   These are the unit tests for the game rules in game_state
+#   To use this, run: python test_game_state.py
+
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from game_state import Board, GameState, BotWorker
+
+class SlowBot:
+    # waits until it is let go, then plays the top left cell
+    def __init__(self):
+        self.go = threading.Event()
+
+    def get_play(self, board):
+        self.go.wait(5)
+        return (0, 0)
+
+class StoppableBot:
+    # searches until it is told to stop
+    def __init__(self):
+        self.searches = 0
+
+    def get_play(self, board, stop=None):
+        self.searches += 1
+        stop.wait(5)
+        return (0, 0)
+
+class BrokenBot:
+    def get_play(self, board):
+        raise RuntimeError("no move")
+
+def wait_for(worker):
+    for _ in range(500):
+        done, move = worker.poll()
+        if done:
+            return move
+        time.sleep(0.01)
+    raise AssertionError("the bot never answered")
+
+class GameStateTestCase(unittest.TestCase):
+
+    def test_no_pygame(self):
+        code = "import sys, game_state; print('pygame' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_board(self):
+        board = Board(6, 5)
+        self.assertEqual(board.get_board()[0][0], 1)
+        self.assertEqual(board.get_board()[4][5], -1)
+        self.assertTrue(board.valid_move(0, 0, 1))
+        self.assertFalse(board.valid_move(0, 0, -1))
+        self.assertFalse(board.valid_move(5, 0, 1))
+        self.assertEqual(board.check_win(), 0)
+
+        self.assertTrue(board.add_piece(2, 2, -1))
+        self.assertEqual(board.get_board()[2][2], -1)
+        board.undo()
+        self.assertEqual(board.get_board()[2][2], 0)
+
+        # the board goes to and from the AI's compact form unchanged
+        flat = board.get_flat_board()
+        self.assertEqual(flat.to_list(), board.get_board())
+        flat = flat.make_move((2, 2), 1)
+        board.set(flat)
+        self.assertEqual(board.get_board(), flat.to_list())
+
+    def test_turns_and_overflow(self):
+        game = GameState()
+        self.assertEqual(game.player(), 1)
+        self.assertFalse(game.play(4, 5))
+
+        # no overflow, the turn passes straight away
+        self.assertTrue(game.play(1, 1))
+        self.assertFalse(game.overflowing)
+        self.assertEqual(game.player(), -1)
+        self.assertTrue(game.play(3, 3))
+
+        # the corner holds two, so this overflows into its neighbours
+        self.assertTrue(game.play(0, 0))
+        self.assertTrue(game.overflowing)
+        self.assertEqual(game.player(), 1)
+        self.assertFalse(game.play(2, 2))
+        game.finish_overflow()
+        self.assertFalse(game.overflowing)
+        self.assertEqual(game.player(), -1)
+        board = game.board.get_board()
+        self.assertEqual(board[0][0], 0)
+        self.assertEqual(board[0][1], 1)
+        self.assertEqual(board[1][0], 1)
+
+        game.undo()
+        self.assertEqual(game.player(), 1)
+        self.assertEqual(game.board.get_board()[0][0], 1)
+
+    def test_undo_redo(self):
+        game = GameState()
+        start = game.board.get_board()
+        self.assertFalse(game.board.add_piece(4, 5, 1))
+        self.assertEqual(len(game.board.history), 0)
+
+        game.play(1, 1)
+        game.play(3, 3)
+        game.play(0, 0)
+        game.finish_overflow()
+        after = game.board.get_board()
+        # only the cells the move and its overflow changed are kept
+        self.assertEqual(game.board.history[-1], {(0, 0): 1, (0, 1): 0, (1, 0): 0})
+
+        game.undo()
+        self.assertEqual(game.board.get_board()[0][0], 1)
+        self.assertEqual(game.player(), 1)
+        self.assertTrue(game.redo())
+        self.assertEqual(game.board.get_board(), after)
+        self.assertEqual(game.player(), -1)
+        self.assertFalse(game.redo())
+
+        game.undo()
+        game.undo()
+        game.undo()
+        self.assertEqual(game.board.get_board(), start)
+        self.assertFalse(game.board.undo())
+        # a new move forgets the undone ones
+        game.play(2, 2)
+        self.assertFalse(game.redo())
+
+        # undoing while the overflow is shown drops the rest of it
+        game = GameState()
+        game.play(1, 1)
+        game.play(3, 3)
+        game.play(0, 0)
+        self.assertTrue(game.overflowing)
+        game.step()
+        game.undo()
+        self.assertFalse(game.overflowing)
+        self.assertEqual(game.player(), 1)
+        self.assertEqual(game.board.get_board()[:2], [[1, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0]])
+        self.assertEqual(game.board.check_win(), 0)
+
+        # and redoing it makes the whole move, overflow and all
+        grid = [[1, 2, 0], [2, 3, 0], [0, 0, -1]]
+        board = Board(3, 3)
+        board.set(grid)
+        game = GameState(board=board)
+        game.play(0, 0)
+        game.finish_overflow()
+        settled = board.get_board()
+        game.undo()
+        game.play(0, 0)
+        game.step()
+        game.undo()
+        self.assertEqual(board.get_board(), grid)
+        self.assertTrue(game.redo())
+        self.assertFalse(game.overflowing)
+        self.assertEqual(board.get_board(), settled)
+        self.assertEqual(game.player(), -1)
+
+    def test_history_depth(self):
+        board = Board(6, 5, max_history=2)
+        for col in range(4):
+            board.add_piece(2, col, 1)
+        self.assertEqual(len(board.history), 2)
+        board.undo()
+        board.undo()
+        self.assertFalse(board.undo())
+        self.assertEqual(board.get_board()[2][:4], [1, 1, 0, 0])
+
+        # undoing with nothing left to undo keeps the turn where it is
+        game = GameState()
+        self.assertFalse(game.undo())
+        self.assertEqual(game.player(), 1)
+        game = GameState(board=Board(6, 5, max_history=1))
+        game.play(1, 1)
+        game.play(3, 3)
+        before = game.board.get_board()
+        self.assertTrue(game.undo())
+        self.assertEqual(game.player(), -1)
+        self.assertFalse(game.undo())
+        self.assertEqual(game.player(), -1)
+        self.assertEqual(game.board.get_board()[3][3], 0)
+        self.assertTrue(game.redo())
+        self.assertEqual(game.board.get_board(), before)
+
+    def test_bot_worker(self):
+        worker = BotWorker()
+        bot = SlowBot()
+        worker.start(bot, GameState().board.get_board())
+        self.assertTrue(worker.thinking())
+        self.assertEqual(worker.poll(), (False, None))
+        bot.go.set()
+        self.assertEqual(wait_for(worker), (0, 0))
+        self.assertFalse(worker.thinking())
+
+        # the move of a cancelled search is thrown away, and no new search
+        # starts until it has returned
+        bot = SlowBot()
+        worker.start(bot, GameState().board.get_board())
+        worker.cancel()
+        self.assertFalse(worker.thinking())
+        self.assertFalse(worker.start(bot, GameState().board.get_board()))
+        bot.go.set()
+        worker.thread.join()
+        self.assertEqual(worker.poll(), (False, None))
+
+        # a bot that takes a stop event is stopped by cancel()
+        bot = StoppableBot()
+        self.assertTrue(worker.start(bot, GameState().board.get_board()))
+        worker.cancel()
+        worker.thread.join(1)
+        self.assertFalse(worker.thread.is_alive())
+        self.assertEqual(worker.poll(), (False, None))
+        self.assertTrue(worker.start(bot, GameState().board.get_board()))
+        worker.cancel()
+        worker.thread.join(1)
+        self.assertEqual(bot.searches, 2)
+
+        self.assertTrue(worker.start(BrokenBot(), GameState().board.get_board()))
+        with self.assertRaises(RuntimeError):
+            wait_for(worker)
+
+    def test_winner(self):
+        game = GameState()
+        # overflowing into player 2's only cell takes it over
+        game.board.set([[1, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 2],
+                        [0, 0, 0, 0, 0, -1]])
+        self.assertTrue(game.play(3, 5))
+        self.assertEqual(game.check_win(), 0)
+        game.finish_overflow()
+        self.assertEqual(game.board.get_board()[4][5], 2)
+        self.assertEqual(game.check_win(), 1)
+
+        game = GameState()
+        game.forfeit()
+        self.assertEqual(game.check_win(), -1)
+        self.assertFalse(game.play(1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#
+#   These are the unit tests for the Monte Carlo tree search bot
+#   To use this, run: python test_mcts_player.py
+
+import unittest
+from a2_partb import make_move, possible_moves
+from mcts_player import MCTSPlayer, MCTSPlayerOne, MCTSPlayerTwo, winner, count_winner
+
+class MCTSTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.start = [[0] * 6 for _ in range(5)]
+        self.start[0][0] = 1
+        self.start[4][5] = -1
+
+    def test_budget(self):
+        bot = MCTSPlayer(1, iterations=200, seed=4)
+        move = bot.get_play(self.start)
+        self.assertIn(move, possible_moves(self.start, 1))
+        self.assertEqual(bot.playouts, 200)
+        self.assertGreater(bot.playouts_per_second, 0)
+        # the same seed plays the same move
+        self.assertEqual(MCTSPlayer(1, iterations=200, seed=4).get_play(self.start), move)
+
+        bot = MCTSPlayerTwo(time_limit=0.05, seed=4)
+        self.assertIn(bot.get_play(self.start), possible_moves(self.start, -1))
+        self.assertGreater(bot.playouts, 0)
+        self.assertLess(bot.seconds, 1.0)
+        self.assertEqual(MCTSPlayerOne().iterations, 1000)
+        self.assertEqual(MCTSPlayerOne().get_name(), "P1 MCTS Bot")
+
+    def test_winning_move(self):
+        # a piece next to the last -1 piece overflows onto it and ends the game
+        board = [[0] * 6 for _ in range(5)]
+        board[0][0] = 1
+        board[2][2] = -1
+        move = MCTSPlayer(1, iterations=300, seed=1).get_play(board)
+        self.assertEqual(winner(make_move(board, move, 1)), 1)
+
+        # no moves under the a2_partb rules
+        board = [[2, -1], [-1, 2]]
+        self.assertIsNone(MCTSPlayer(1, iterations=10).get_play(board))
+
+    def test_scoring(self):
+        self.assertEqual(winner(self.start), 0)
+        self.assertEqual(winner([[0, 2], [1, 0]]), 1)
+        self.assertEqual(winner([[0, -2], [0, 0]]), -1)
+        self.assertEqual(count_winner([[1, -1], [-2, 0]]), -1)
+        self.assertEqual(count_winner(self.start), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#
+#   These are the unit tests for the opening book
+#   To use this, run: python test_opening_book.py
+
+import os
+import tempfile
+import unittest
+from a2_partb import GameTree
+from opening_book import OpeningBook, build_book, book_moves, write_book, load_book, position_key
+from search_player import SearchPlayer, play
+
+class OpeningBookTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.start = [[0] * 6 for _ in range(5)]
+        self.start[0][0] = 1
+        self.start[4][5] = -1
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "book.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_book(self):
+        count = build_book(self.path, plies=3, depth=4)
+        book = OpeningBook(self.path)
+        self.assertEqual(len(book), count)
+
+        # the book move is the move a search of the book's height picks
+        tree = GameTree(self.start, 1, 4, search="alphabeta")
+        tree.get_move()
+        self.assertEqual(book.lookup(self.start, 1), tree.best_root_move)
+
+        # player 1 has a book move after every reply to its first one
+        after = play(self.start, book.lookup(self.start, 1), 1)
+        for i in range(5):
+            for j in range(6):
+                if after[i][j] <= 0:
+                    self.assertIsNotNone(book.lookup(play(after, (i, j), -1), 1))
+        self.assertIsNotNone(book.lookup(after, -1))
+
+        # positions outside the book, or of another size, are not answered
+        self.assertIsNone(book.lookup(self.start, -1))
+        self.assertIsNone(book.lookup([row + [0] for row in self.start], 1))
+        moves = book_moves(plies=3, depth=4)
+        self.assertEqual(book.lookup(after, -1), moves[position_key(after, -1)])
+        book.close()
+
+    def test_search_player(self):
+        write_book({position_key(self.start, 1): (2, 3)}, self.path)
+        book = OpeningBook(self.path)
+        player = SearchPlayer(1, "book", book=book)
+        self.assertEqual(player.get_play(self.start), (2, 3))
+        # positions not in the book are searched
+        board = play(self.start, (2, 3), 1)
+        self.assertEqual(player.get_play(board), SearchPlayer(1, "search").get_play(board))
+        book.close()
+
+    def test_bad_file(self):
+        self.assertIsNone(load_book(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a book at all")
+        self.assertIsNone(load_book(self.path))
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
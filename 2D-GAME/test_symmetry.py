@@ -0,0 +1,81 @@
+#
+#   These are the unit tests for the board symmetries
+#   To use this, run: python test_symmetry.py
+
+import random
+import unittest
+from a2_parta import HashTable
+from a2_partb import GameTree, make_move, possible_moves
+from symmetry import symmetries, inverse, transform_move, transform_board, canonical, unique_moves
+
+class SymmetryTestCase(unittest.TestCase):
+
+    def random_board(self, rng, rows, cols):
+        board = [[0] * cols for _ in range(rows)]
+        board[0][0] = 1
+        board[rows - 1][cols - 1] = -1
+        player = 1
+        for _ in range(rng.randrange(12)):
+            board = make_move(board, rng.choice(possible_moves(board, player)), player)
+            player = -player
+        return board, player
+
+    def test_transforms(self):
+        self.assertEqual(len(symmetries(5, 6)), 4)
+        self.assertEqual(len(symmetries(5, 5)), 8)
+        rng = random.Random(1)
+        for rows, cols in ((5, 6), (5, 5)):
+            board, player = self.random_board(rng, rows, cols)
+            images = [transform_board(board, sym) for sym in symmetries(rows, cols)]
+            for sym in symmetries(rows, cols):
+                image = transform_board(board, sym)
+                self.assertEqual(transform_board(image, inverse(sym)), board)
+                self.assertIn(transform_board(image, sym), images)
+                # every image has the same canonical form
+                self.assertEqual(canonical(image)[0], canonical(board)[0])
+                # moves commute with the symmetry
+                for move in possible_moves(board, player):
+                    self.assertEqual(transform_board(make_move(board, move, player), sym),
+                                     make_move(image, transform_move(move, sym, rows, cols), player))
+            form, sym = canonical(board)
+            self.assertEqual(transform_board(board, sym), form)
+
+    def test_unique_moves(self):
+        board = [[0] * 6 for _ in range(5)]
+        board[2][0] = board[2][5] = 1
+        board[0][2] = board[0][3] = -1
+        moves = possible_moves(board, 1)
+        # mirrored left to right: one move per pair of columns
+        self.assertEqual(unique_moves(board, moves), [move for move in moves if move[1] < 3])
+        board[4][0] = -1
+        self.assertEqual(unique_moves(board, moves), moves)
+
+    def test_search(self):
+        rng = random.Random(4)
+        for _ in range(10):
+            board = [[0] * 6 for _ in range(5)]
+            for _ in range(3):
+                i, j = rng.randrange(5), rng.randrange(3)
+                board[i][j] = board[i][5 - j] = rng.choice((1, -1))
+            plain = GameTree(board, 1, 4, search="alphabeta", transposition=True)
+            tree = GameTree(board, 1, 4, search="alphabeta", transposition=True, symmetry=True)
+            self.assertEqual(tree.get_move(), plain.get_move())
+            self.assertLessEqual(tree.nodes, plain.nodes)
+
+        # a position and its mirror image share their table entries; the
+        # mirror image is searched in another move order, so some are new
+        board, player = self.random_board(rng, 5, 6)
+        image = transform_board(board, (0, 0, 1))
+        table = HashTable()
+        first = GameTree(board, player, 4, search="alphabeta", table=table, symmetry=True)
+        mirror = GameTree(image, player, 4, search="alphabeta", table=table, symmetry=True)
+        fresh = GameTree(image, player, 4, search="alphabeta", transposition=True, symmetry=True)
+        self.assertGreater(mirror.tt_hits, 0)
+        self.assertLess(mirror.nodes, fresh.nodes)
+        self.assertEqual(mirror.best_score, first.best_score)
+
+        with self.assertRaises(ValueError):
+            GameTree(board, player, 2, search="minimax", symmetry=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# Zobrist hashing for Chain Reaction boards.
+#
+# Every (row, col, value) triple gets a fixed 64 bit random key and a board
+# hashes to the XOR of the keys of its non-empty cells.  Because XOR is its
+# own inverse, a move only has to XOR out the old value and XOR in the new
+# value of the cells it changed, which is what the trail recorded by
+# a2_partb.make_move provides.
+
+import random
+
+
+class Zobrist:
+    def __init__(self, seed=0):
+        """
+        Initialize the key generator.
+
+        Parameters:
+        seed (int): Seed for the keys. Keys only depend on the seed and the
+                    (row, col, value) triple, so hashes are stable across runs
+                    and processes.
+        """
+        self.seed = seed
+        self.keys = {}
+        # XORed in when the player to move is -1
+        self.side = self.random_key("side")
+        # XORed in when the tree is searched for player -1
+        self.root_side = self.random_key("root")
+
+    def random_key(self, label):
+        """
+        Return the 64 bit random number for a label.
+
+        Parameters:
+        label (str): The name of the key.
+
+        Returns:
+        int: A 64 bit random number.
+        """
+        return random.Random("{}:{}".format(self.seed, label)).getrandbits(64)
+
+    def key(self, row, col, value):
+        """
+        Get the key for a cell holding a value.
+
+        Parameters:
+        row (int): The row of the cell.
+        col (int): The column of the cell.
+        value (int): The value in the cell.
+
+        Returns:
+        int: The key of the cell. Empty cells have key 0.
+        """
+        if value == 0:
+            return 0
+        cell = (row, col, value)
+        key = self.keys.get(cell)
+        if key is None:
+            key = self.random_key("{}:{}:{}".format(row, col, value))
+            self.keys[cell] = key
+        return key
+
+    def hash_board(self, board):
+        """
+        Hash a whole board from scratch.
+
+        Parameters:
+        board (list of list of int): The board to hash, or a FlatBoard.
+
+        Returns:
+        int: The Zobrist hash of the board.
+        """
+        if hasattr(board, "to_list"):
+            board = board.to_list()
+        h = 0
+        for i in range(len(board)):
+            for j in range(len(board[0])):
+                if board[i][j] != 0:
+                    h ^= self.key(i, j, board[i][j])
+        return h
+
+    def update(self, h, trail):
+        """
+        Update a hash with the changes recorded while making a move.
+
+        Parameters:
+        h (int): The hash of the board before the changes.
+        trail (list of tuple): (row, col, old value, new value) for every
+                               write made to the board, in order.
+
+        Returns:
+        int: The hash of the board after the changes.
+        """
+        for row, col, old, new in trail:
+            h ^= self.key(row, col, old) ^ self.key(row, col, new)
+        return h
+
+
+# Shared key set so hashes from different searches can be compared.
+ZOBRIST = Zobrist()